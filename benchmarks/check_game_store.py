@@ -0,0 +1,145 @@
+"""Regression check of GameData's precomputed answers against brute-force pandas over the raw game rows.
+
+Run it with `python -m benchmarks.check_game_store` (synthetic games from benchmarks.generate_games, with some stats
+blanked out and a game_type column) or `--data-dir <dir with games_parquet or all_games.csv>` for real data. The same
+random queries are checked against four builds of the data: a fresh GameData, one grown with `extend`, a snapshot
+round-trip and an extended snapshot. Exits non-zero on any mismatch, so cube sums, FG%, leaderboard tie-breaking
+and the snapshot encoding cannot drift silently.
+"""
+import os
+import sys
+import random
+import argparse
+import tempfile
+import numpy as np
+from game_store import CUBE_STATS, GameData, compact_dtypes, read_games
+from benchmarks.generate_games import game_rows, player_seasons
+
+LEADER_STATS = ['pts', 'reb', 'ast', 'blk', 'plus_minus']
+
+def synthetic_games(rows, seed, null_fraction):
+    rng = np.random.default_rng(seed)
+    df = game_rows(rng, *player_seasons(rng, 1, max(rows // 400, 10))).iloc[:rows].reset_index(drop=True)
+    df['player_name'] = df['player_name'].where(df['player_id'] % 7 != 0, df['player_name'].str.upper())
+    df['game_type'] = np.where(rng.random(len(df)) < 0.1, 'Playoffs', 'Regular Season')
+    for stat in CUBE_STATS:
+        df[stat] = df[stat].astype('Int64').mask(rng.random(len(df)) < null_fraction)
+    return df
+
+class BruteForce:
+    """Answers the same questions as GameData by filtering and grouping the raw rows every time."""
+
+    def __init__(self, df):
+        self.df = df.astype({c: str for c in ['player_name', 'season', 'opponent', 'game_type'] if c in df})
+        self.keys = self.df['player_name'].str.lower().to_numpy()
+
+    def rows(self, player_name, seasons=None, opponent=None, game_type=None):
+        mask = self.keys == player_name.lower()
+        if seasons:
+            mask &= self.df['season'].isin(seasons).to_numpy()
+        if opponent:
+            mask &= (self.df['opponent'] == opponent).to_numpy()
+        if game_type:
+            mask &= (self.df['game_type'].str.lower() == game_type.lower()).to_numpy()
+        return self.df[mask]
+
+    def aggregate(self, player_name, **filters):
+        rows = self.rows(player_name, **filters)
+        if rows.empty:
+            return None
+        totals = {'games': len(rows)}
+        for stat in CUBE_STATS:
+            totals[stat], totals[f'{stat}_count'] = int(rows[stat].sum()), int(rows[stat].count())
+        return totals
+
+    def top_performers(self, opponent, stat, season='', k=1, min_games=1):
+        rows = self.df[(self.df['opponent'] == opponent) & ((self.df['season'] == season) if season else True)]
+        grouped = rows.groupby('player_name')[stat].agg(['mean', 'size', 'max', 'count'])
+        grouped = grouped[grouped['count'] > 0]
+        if grouped.empty:
+            return None
+        grouped = grouped[grouped['size'] >= min_games]
+        ranked = sorted(grouped.itertuples(), key=lambda row: (-row.mean, row.Index))[:k]
+        return [(row.Index, row.mean, int(row.size), int(row.max)) for row in ranked]
+
+def check(data, expected, queries):
+    failures = []
+    for kind, args, kwargs in queries:
+        got = getattr(data, kind)(*args, **kwargs)
+        if kind == 'player_games':
+            rows = expected.rows(*args, **kwargs)
+            got = sorted(zip(got['season'].astype(str), got['game_id'].astype(str)))
+            want = sorted(zip(rows['season'], rows['game_id']))
+            same = got == want
+        elif kind == 'aggregate':
+            want = expected.aggregate(*args, **kwargs)
+            same = (got is None) == (want is None) and (want is None or all(int(got[key]) == value for key, value in want.items()))
+            if same and want is not None:
+                # The tools average as sum / count and pool shooting percentages; both must match pandas on the rows.
+                rows = expected.rows(*args, **kwargs)
+                same = all(np.isclose(got[stat] / got[f'{stat}_count'], rows[stat].mean()) for stat in CUBE_STATS if got[f'{stat}_count'])
+                same &= not got['fga'] or np.isclose(got['fgm'] / got['fga'], rows['fgm'].sum() / rows['fga'].sum())
+        else:
+            want = expected.top_performers(*args, **kwargs)
+            same = (got is None) == (want is None) and (want is None or (
+                len(got) == len(want) and all(g[0] == w[0] and np.isclose(g[1], w[1]) and g[2:] == w[2:] for g, w in zip(got, want))))
+        if not same:
+            failures.append((kind, args, kwargs, got, want))
+    return failures
+
+def random_queries(df, count, seed):
+    rng = random.Random(seed)
+    names = sorted(df['player_name'].astype(str).unique())
+    seasons = sorted(df['season'].astype(str).unique())
+    opponents = sorted(df['opponent'].astype(str).unique())
+    game_types = [''] + (sorted(df['game_type'].astype(str).unique()) if 'game_type' in df else [])
+    queries = []
+    for _ in range(count):
+        name = rng.choice(names)
+        name = rng.choice([name, name.lower(), name.upper()])
+        picked = rng.sample(seasons, rng.randint(1, min(3, len(seasons)))) if rng.random() < 0.5 else None
+        opponent = rng.choice(opponents) if rng.random() < 0.3 else None
+        queries.append(('aggregate', (name,), {'seasons': picked, 'opponent': opponent, 'game_type': rng.choice(game_types) or None}))
+        queries.append(('player_games', (name,), {'seasons': picked, 'opponent': opponent}))
+        queries.append(('top_performers', (rng.choice(opponents), rng.choice(LEADER_STATS)),
+                        {'season': rng.choice([''] + seasons), 'k': rng.choice([1, 5, 25]), 'min_games': rng.choice([1, 1, 3])}))
+    return queries
+
+def builds(df, directory):
+    seasons = sorted(df['season'].astype(str).unique())
+    later = df['season'].astype(str).isin(seasons[len(seasons) * 2 // 3:])
+    fresh = GameData(compact_dtypes(df.copy()))
+    yield 'fresh', fresh
+    yield 'extended', GameData(compact_dtypes(df[~later].copy())).extend(compact_dtypes(df[later].copy()))
+    fresh.write_snapshot(os.path.join(directory, 'full'))
+    yield 'snapshot', GameData.load_snapshot(os.path.join(directory, 'full'))
+    GameData(compact_dtypes(df[~later].copy())).write_snapshot(os.path.join(directory, 'partial'))
+    base = GameData.load_snapshot(os.path.join(directory, 'partial'), extendable=True)
+    yield 'extended snapshot', base.extend(compact_dtypes(df[later].copy()))
+
+def main(args):
+    if args.data_dir:
+        path = os.path.join(args.data_dir, 'games_parquet')
+        df = read_games(path if os.path.isdir(path) else os.path.join(args.data_dir, 'all_games.csv'))
+    else:
+        df = synthetic_games(args.rows, args.seed, args.null_fraction)
+    expected = BruteForce(df)
+    queries = random_queries(df, args.queries, args.seed)
+    failed = False
+    with tempfile.TemporaryDirectory() as directory:
+        for name, data in builds(df, directory):
+            failures = check(data, expected, queries)
+            print(f"{name:18s} {len(queries) - len(failures)}/{len(queries)} queries match")
+            for kind, query_args, kwargs, got, want in failures[:5]:
+                print(f"  {kind}{query_args} {kwargs}\n    got  {got}\n    want {want}")
+            failed |= bool(failures)
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check GameData's cube, leaderboards and snapshots against brute-force pandas.")
+    parser.add_argument("--data-dir", help="Check real data from this directory instead of synthetic games.")
+    parser.add_argument("--rows", type=int, default=40_000)
+    parser.add_argument("--null-fraction", type=float, default=0.02, help="Share of synthetic stat values left blank.")
+    parser.add_argument("--queries", type=int, default=300, help="Random queries per kind.")
+    parser.add_argument("--seed", type=int, default=0)
+    sys.exit(main(parser.parse_args()))
@@ -0,0 +1,97 @@
+"""Local stand-in for the OpenAI chat-completions endpoint, for load-testing main.py without paid API calls.
+
+Run it with `uvicorn benchmarks.fake_openai:app --port 8002` and start the app with
+`OPENAI_BASE_URL=http://127.0.0.1:8002/v1`. A request that offers tools gets back a scripted set of `tool_calls`.
+Any other request (the follow-up after the tool results) gets a short Markdown report, streamed token by token
+when `stream` is set.
+
+FAKE_OPENAI_LATENCY_SECONDS delays every response, FAKE_OPENAI_TOKEN_SECONDS spaces out streamed chunks, and
+FAKE_OPENAI_SCRIPT points to a JSON list of scripted turns. Each turn is a list of {"name", "arguments"} tool calls;
+"{player}" and "{team}" in argument values are filled with a random "Player N" (up to FAKE_OPENAI_PLAYERS) and team.
+"""
+import os
+import json
+import random
+import asyncio
+import itertools
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+from game_store import TEAMS
+
+LATENCY_SECONDS = float(os.getenv("FAKE_OPENAI_LATENCY_SECONDS", "0.2"))
+TOKEN_SECONDS = float(os.getenv("FAKE_OPENAI_TOKEN_SECONDS", "0.005"))
+PLAYERS = int(os.getenv("FAKE_OPENAI_PLAYERS", "400"))
+DEFAULT_SCRIPT = [
+    [{"name": "calculate_player_averages", "arguments": {"player_name": "{player}", "opponent": "{team}"}}],
+    [{"name": "get_player_stat_progression", "arguments": {"player_name": "{player}", "stats": "points, rebounds, assists"}}],
+    [{"name": "compare_players_averages", "arguments": {"player_a_name": "{player}", "player_b_name": "{player}"}}],
+    [{"name": "find_top_performer_against_team", "arguments": {"opponent_team": "{team}", "top_k": 5, "min_games": 3}}],
+    [{"name": "get_player_career_high", "arguments": {"player_name": "{player}", "stat": "points"}},
+     {"name": "get_player_total_stats", "arguments": {"player_name": "{player}"}}],
+    [{"name": "analyze_player_form", "arguments": {"player_name": "{player}", "analysis": "best", "window": 10}}],
+]
+
+def load_script():
+    path = os.getenv("FAKE_OPENAI_SCRIPT")
+    if not path:
+        return DEFAULT_SCRIPT
+    with open(path) as f:
+        return json.load(f)
+
+app = FastAPI()
+turns = itertools.cycle(load_script())
+call_ids = itertools.count(1)
+
+def fill(value):
+    if isinstance(value, str):
+        return value.replace("{player}", f"Player {random.randint(1, PLAYERS)}").replace("{team}", random.choice(TEAMS))
+    return value
+
+def usage(messages, completion):
+    prompt_tokens = sum(len(str(m.get("content") or "")) for m in messages) // 4
+    completion_tokens = len(completion) // 4
+    return {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens, "total_tokens": prompt_tokens + completion_tokens}
+
+def report(messages):
+    results = [m["content"] for m in messages if m.get("role") == "tool"]
+    return "## Scouting Report\n\n" + "\n".join(f"- **Finding {i}:** {r[:120]}" for i, r in enumerate(results, start=1))
+
+def chunk(delta, finish_reason=None, usage=None):
+    body = {"id": "chatcmpl-fake", "object": "chat.completion.chunk", "created": 0, "model": "fake",
+            "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}] if delta is not None else []}
+    if usage:
+        body["usage"] = usage
+    return f"data: {json.dumps(body)}\n\n"
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    messages = body["messages"]
+    await asyncio.sleep(LATENCY_SECONDS)
+    if body.get("tools") and messages[-1].get("role") == "user":
+        tool_calls = [
+            {"id": f"call_{next(call_ids)}", "type": "function",
+             "function": {"name": call["name"], "arguments": json.dumps({k: fill(v) for k, v in call["arguments"].items()})}}
+            for call in next(turns)
+        ]
+        message, finish_reason = {"role": "assistant", "content": None, "tool_calls": tool_calls}, "tool_calls"
+    else:
+        message, finish_reason = {"role": "assistant", "content": report(messages)}, "stop"
+
+    if body.get("stream"):
+        async def events():
+            text = message.get("content") or ""
+            for start in range(0, len(text), 16):
+                yield chunk({"content": text[start:start + 16]})
+                await asyncio.sleep(TOKEN_SECONDS)
+            yield chunk({}, finish_reason)
+            if (body.get("stream_options") or {}).get("include_usage"):
+                yield chunk(None, usage=usage(messages, text))
+            yield "data: [DONE]\n\n"
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    return {
+        "id": "chatcmpl-fake", "object": "chat.completion", "created": 0, "model": "fake",
+        "choices": [{"index": 0, "message": message, "finish_reason": finish_reason}],
+        "usage": usage(messages, message.get("content") or json.dumps(message.get("tool_calls"))),
+    }
@@ -0,0 +1,72 @@
+"""Synthetic all_games.csv generator for benchmarking main.py without the NBA API.
+
+Run it with `python -m benchmarks.generate_games --rows 1000000 --output all_games.csv` (add `--parquet games_parquet`
+to also build the season-partitioned dataset). Rows follow CSV_HEADERS: players named "Player 1", "Player 2", ... play
+full careers of 40-82 games a season against random opponents, with per-player scoring levels so leaderboards and
+averages have realistic spread. Output is deterministic for a given --seed and written in chunks, so 10M rows fit
+comfortably in memory.
+"""
+import time
+import argparse
+import numpy as np
+import pandas as pd
+from game_store import CSV_HEADERS, TEAMS
+
+FIRST_SEASON = 1996
+LAST_SEASON = 2024
+PLAYERS_PER_CHUNK = 2000
+
+SEASONS = np.array([f"{year}-{str(year + 1)[-2:]}" for year in range(FIRST_SEASON, LAST_SEASON + 1)])
+
+def player_seasons(rng, first_player, count):
+    """Career span, scoring level and games played per season for `count` players; one entry per player-season."""
+    starts = rng.integers(FIRST_SEASON, LAST_SEASON + 1, count)
+    lengths = np.minimum(rng.integers(1, 19, count), LAST_SEASON + 1 - starts)
+    offsets = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    player_ids = np.repeat(np.arange(first_player, first_player + count), lengths)
+    scoring = np.repeat(rng.gamma(2.0, 6.0, count) + 2, lengths)
+    return player_ids, np.repeat(starts, lengths) + offsets, scoring, rng.integers(40, 83, len(player_ids))
+
+def game_rows(rng, player_ids, years, scoring, games_per_season):
+    """Expands player-seasons into games with plausible, player-dependent box scores."""
+    player, year, scoring = (np.repeat(a, games_per_season) for a in (player_ids, years, scoring))
+    game_number = np.arange(len(player)) - np.repeat(np.cumsum(games_per_season) - games_per_season, games_per_season) + 1
+    count = len(player)
+    fga = rng.poisson(scoring * 0.8)
+    fg3a = rng.binomial(fga, 0.35)
+    fg3m = rng.binomial(fg3a, 0.36)
+    fgm = rng.binomial(fga - fg3a, 0.5) + fg3m
+    return pd.DataFrame({
+        'player_id': player, 'player_name': np.char.add('Player ', player.astype(str)), 'season': SEASONS[year - FIRST_SEASON],
+        'game_id': np.char.add(np.char.add('002', np.char.zfill((year % 100).astype(str), 2)), np.char.zfill(game_number.astype(str), 5)),
+        'opponent': np.asarray(TEAMS)[rng.integers(0, len(TEAMS), count)],
+        'pts': 2 * fgm + fg3m + rng.poisson(scoring * 0.2), 'reb': rng.poisson(scoring * 0.3 + 1), 'ast': rng.poisson(scoring * 0.2 + 0.5),
+        'plus_minus': np.rint(rng.normal(0, 10, count)).astype(int), 'blk': rng.poisson(0.5, count), 'stl': rng.poisson(0.8, count),
+        'tov': rng.poisson(1.5, count), 'pf': rng.poisson(2.2, count), 'fgm': fgm, 'fga': fga, 'fg3m': fg3m, 'fg3a': fg3a,
+    })[CSV_HEADERS]
+
+def generate(output, rows, seed=0):
+    rng = np.random.default_rng(seed)
+    written, next_player = 0, 1
+    with open(output, 'w', newline='') as f:
+        while written < rows:
+            chunk = game_rows(rng, *player_seasons(rng, next_player, PLAYERS_PER_CHUNK)).iloc[:rows - written]
+            chunk.to_csv(f, header=written == 0, index=False)
+            written += len(chunk)
+            next_player += PLAYERS_PER_CHUNK
+    return written
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a synthetic all_games.csv for benchmarks.")
+    parser.add_argument("--rows", type=int, default=100_000, help="Number of game rows to write (10k to 10M is typical).")
+    parser.add_argument("--output", default="all_games.csv")
+    parser.add_argument("--parquet", help="Also convert the CSV into a season-partitioned parquet dataset at this path.")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    start = time.perf_counter()
+    count = generate(args.output, args.rows, args.seed)
+    print(f"Wrote {count} rows to {args.output} in {time.perf_counter() - start:.1f}s.")
+    if args.parquet:
+        from game_store import convert_csv
+        convert_csv(args.output, args.parquet)
+        print(f"Converted {args.output} into {args.parquet}.")
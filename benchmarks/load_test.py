@@ -0,0 +1,142 @@
+"""End-to-end load test of /scout (or /scout/stream) against the fake OpenAI server.
+
+With `--spawn`, the script starts benchmarks.fake_openai and a main.py server in --data-dir, points the app at the fake
+server through OPENAI_BASE_URL and waits for /health before sending traffic:
+
+    python -m benchmarks.load_test --spawn --data-dir /tmp/bench --concurrency 32 --requests 2000
+
+Without it, it targets an app already running at --url. Queries are unique by default so the answer cache does not
+short-circuit the model round trips; pass --repeat-queries N to cycle through N distinct questions instead. The report
+gives throughput, latency percentiles and error counts; for /scout/stream it also reports time to first token.
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import subprocess
+import httpx
+from benchmarks.report import summarize, print_table
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+QUESTIONS = [
+    "How has player {n}'s scoring changed season by season?",
+    "Who has played best against the Lakers, case {n}?",
+    "Compare two players head to head, case {n}.",
+    "What is the career high for player {n}?",
+]
+
+def question(i, distinct):
+    n = i if distinct is None else i % distinct
+    return QUESTIONS[n % len(QUESTIONS)].format(n=n)
+
+async def scout(client, endpoint, query):
+    start = time.perf_counter()
+    first_token = None
+    if endpoint.endswith("/stream"):
+        async with client.stream("POST", endpoint, json={"query": query}) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if first_token is None and line == "event: token":
+                    first_token = time.perf_counter() - start
+                if line == "event: error":
+                    raise RuntimeError("stream reported an error")
+    else:
+        response = await client.post(endpoint, json={"query": query})
+        response.raise_for_status()
+    return time.perf_counter() - start, first_token
+
+async def run(url, endpoint, concurrency, requests, duration, distinct, timeout):
+    latencies, first_tokens, errors = [], [], {}
+    counter = iter(range(sys.maxsize))
+    deadline = time.perf_counter() + duration if duration else None
+
+    async def worker(client):
+        while True:
+            i = next(counter)
+            if (deadline and time.perf_counter() >= deadline) or (not deadline and i >= requests):
+                return
+            try:
+                latency, first_token = await scout(client, endpoint, question(i, distinct))
+                latencies.append(latency)
+                if first_token is not None:
+                    first_tokens.append(first_token)
+            except Exception as e:
+                key = type(e).__name__
+                errors[key] = errors.get(key, 0) + 1
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=url, timeout=timeout, limits=limits) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+    return latencies, first_tokens, errors, elapsed
+
+def wait_for(url, process, timeout=120):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{url} exited with code {process.returncode}")
+        try:
+            if httpx.get(url, timeout=1).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"{url} did not become healthy in {timeout}s")
+
+def spawn(data_dir, app_port, fake_port, workers, fake_latency):
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [ROOT, os.getenv("PYTHONPATH")]))}
+    fake = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "benchmarks.fake_openai:app", "--port", str(fake_port), "--log-level", "warning"],
+        cwd=ROOT, env={**env, "FAKE_OPENAI_LATENCY_SECONDS": str(fake_latency)},
+    )
+    app = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(app_port), "--workers", str(workers), "--log-level", "warning"],
+        cwd=data_dir, env={**env, "OPENAI_BASE_URL": f"http://127.0.0.1:{fake_port}/v1", "OPENAI_API_KEY": "unused", "SCOUT_WARMUP": "eager"},
+    )
+    wait_for(f"http://127.0.0.1:{fake_port}/docs", fake)
+    wait_for(f"http://127.0.0.1:{app_port}/health", app)
+    return [fake, app]
+
+def main(args):
+    processes = spawn(args.data_dir, args.app_port, args.fake_port, args.workers, args.fake_latency) if args.spawn else []
+    url = f"http://127.0.0.1:{args.app_port}" if args.spawn else args.url
+    try:
+        latencies, first_tokens, errors, elapsed = asyncio.run(
+            run(url, args.endpoint, args.concurrency, args.requests, args.duration, args.repeat_queries, args.timeout)
+        )
+    finally:
+        for process in processes:
+            process.terminate()
+            process.wait()
+    completed = len(latencies)
+    print(f"{completed} requests in {elapsed:.2f}s at concurrency {args.concurrency}: {completed / elapsed:.1f} req/s, "
+          f"{sum(errors.values())} errors" + (f" {errors}" if errors else ""))
+    rows = [(args.endpoint, summarize(latencies))]
+    if first_tokens:
+        rows.append(("time to first token", summarize(first_tokens)))
+    print_table(rows)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({"requests": completed, "seconds": elapsed, "throughput": completed / elapsed, "errors": errors,
+                       **{name: summary for name, summary in rows}}, f, indent=2)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load-test the scouting API against a fake OpenAI server.")
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="Running app to target when --spawn is not set.")
+    parser.add_argument("--endpoint", default="/scout", choices=["/scout", "/scout/stream"])
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=500, help="Total requests to send (ignored with --duration).")
+    parser.add_argument("--duration", type=float, help="Send requests for this many seconds instead of a fixed count.")
+    parser.add_argument("--repeat-queries", type=int, help="Cycle through this many distinct questions to exercise the caches.")
+    parser.add_argument("--timeout", type=float, default=60)
+    parser.add_argument("--json", help="Also write the results to this file.")
+    parser.add_argument("--spawn", action="store_true", help="Start the fake OpenAI server and the app before the test.")
+    parser.add_argument("--data-dir", default=".", help="With --spawn, directory containing games_parquet or all_games.csv.")
+    parser.add_argument("--app-port", type=int, default=8001)
+    parser.add_argument("--fake-port", type=int, default=8002)
+    parser.add_argument("--workers", type=int, default=1, help="With --spawn, number of uvicorn workers for the app.")
+    parser.add_argument("--fake-latency", type=float, default=0.2, help="With --spawn, seconds the fake model waits per call.")
+    main(parser.parse_args())
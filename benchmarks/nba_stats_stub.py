@@ -0,0 +1,79 @@
+"""Local stand-in for the stats.nba.com endpoints that data_ingestion.py calls.
+
+Run it with `uvicorn benchmarks.nba_stats_stub:app --port 8001` and point the ingestion at it with
+`NBA_STATS_BASE_URL=http://127.0.0.1:8001`. Game logs are synthetic but deterministic per player and season.
+STUB_SEASON_PROGRESS (0-1) controls how much of the current season has been played, so raising it between two
+runs simulates new games for `data_ingestion.py --incremental`.
+"""
+import os
+import random
+import asyncio
+from datetime import datetime
+from fastapi import FastAPI
+from nba_api.stats.static import players
+from game_store import TEAMS
+
+LATENCY_SECONDS = float(os.getenv("STUB_LATENCY_SECONDS", "0.05"))
+SEASON_PROGRESS = float(os.getenv("STUB_SEASON_PROGRESS", "1.0"))
+CURRENT_SEASON_YEAR = datetime.now().year if datetime.now().month >= 10 else datetime.now().year - 1
+GAME_LOG_HEADERS = [
+    'SEASON_ID', 'Player_ID', 'Game_ID', 'GAME_DATE', 'MATCHUP', 'WL', 'MIN', 'FGM', 'FGA', 'FG_PCT', 'FG3M', 'FG3A',
+    'FG3_PCT', 'FTM', 'FTA', 'FT_PCT', 'OREB', 'DREB', 'REB', 'AST', 'STL', 'BLK', 'TOV', 'PF', 'PTS', 'PLUS_MINUS',
+    'VIDEO_AVAILABLE'
+]
+
+app = FastAPI()
+
+def result_set(name, headers, rows):
+    return {"name": name, "headers": headers, "rowSet": rows}
+
+def from_year(player_id):
+    return random.Random(player_id).randint(2008, CURRENT_SEASON_YEAR)
+
+def game_log_rows(player_id, season):
+    year = int(season[:4])
+    if year < from_year(player_id) or year > CURRENT_SEASON_YEAR:
+        return []
+    rng = random.Random(player_id * 10000 + year)
+    team = rng.choice(TEAMS)
+    games_played = rng.randint(40, 82)
+    last_game = int(games_played * SEASON_PROGRESS) if year == CURRENT_SEASON_YEAR else games_played
+    rows = []
+    for game in range(games_played, 0, -1):
+        fga = rng.randint(5, 25)
+        fg3a = rng.randint(0, min(fga, 10))
+        fgm, fg3m = rng.randint(0, fga), rng.randint(0, fg3a)
+        ftm = rng.randint(0, 8)
+        opponent = rng.choice([t for t in TEAMS if t != team])
+        matchup = f"{team} vs. {opponent}" if game % 2 else f"{team} @ {opponent}"
+        rows.append([
+            f"2{year}", player_id, f"002{str(year)[-2:]}{player_id % 1000:03d}{game:02d}", f"GAME {game}, {year}", matchup,
+            rng.choice('WL'), rng.randint(10, 40), fgm, fga, round(fgm / fga, 3), fg3m, fg3a, 0.0, ftm, ftm + 1, 0.0,
+            rng.randint(0, 4), rng.randint(0, 10), rng.randint(0, 14), rng.randint(0, 12), rng.randint(0, 4),
+            rng.randint(0, 4), rng.randint(0, 6), rng.randint(0, 6), 2 * fgm + fg3m + ftm, rng.randint(-25, 25), 1,
+        ])
+    return rows[games_played - last_game:]
+
+@app.get("/commonplayerinfo")
+async def common_player_info(PlayerID: int):
+    await asyncio.sleep(LATENCY_SECONDS)
+    return {"resultSets": [
+        result_set("CommonPlayerInfo", ["PERSON_ID", "FROM_YEAR", "TO_YEAR"], [[PlayerID, from_year(PlayerID), CURRENT_SEASON_YEAR]]),
+        result_set("PlayerHeadlineStats", [], []),
+        result_set("AvailableSeasons", [], []),
+    ]}
+
+@app.get("/playergamelog")
+async def player_game_log(PlayerID: int, Season: str):
+    await asyncio.sleep(LATENCY_SECONDS)
+    return {"resultSets": [result_set("PlayerGameLog", GAME_LOG_HEADERS, game_log_rows(PlayerID, Season))]}
+
+@app.get("/leaguegamelog")
+async def league_game_log(Season: str, PlayerOrTeam: str = "P"):
+    await asyncio.sleep(LATENCY_SECONDS)
+    headers = ['SEASON_ID', 'PLAYER_ID', 'PLAYER_NAME', 'GAME_ID', 'GAME_DATE', 'MATCHUP', 'PTS']
+    rows = []
+    for player in players.get_active_players():
+        for row in game_log_rows(player['id'], Season):
+            rows.append([row[0], player['id'], player['full_name'], row[2], row[3], row[4], row[24]])
+    return {"resultSets": [result_set("LeagueGameLog", headers, rows)]}
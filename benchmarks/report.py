@@ -0,0 +1,21 @@
+"""Latency summaries shared by the benchmark scripts."""
+import numpy as np
+
+PERCENTILES = (50, 95, 99)
+
+def summarize(latencies):
+    """Mean, p50/p95/p99 and max of a list of latencies in seconds, reported in milliseconds."""
+    values = np.asarray(latencies, dtype=np.float64) * 1000
+    if not len(values):
+        return {"count": 0}
+    summary = {"count": len(values), "mean_ms": values.mean()}
+    summary.update({f"p{p}_ms": value for p, value in zip(PERCENTILES, np.percentile(values, PERCENTILES))})
+    summary["max_ms"] = values.max()
+    return {k: round(float(v), 3) if k != "count" else v for k, v in summary.items()}
+
+def print_table(rows, name_width=34):
+    """Prints one line per (name, summary) pair with the columns from `summarize`."""
+    columns = ["count", "mean_ms", "p50_ms", "p95_ms", "p99_ms", "max_ms"]
+    print(f"{'':{name_width}s}" + "".join(f"{c:>11s}" for c in columns))
+    for name, summary in rows:
+        print(f"{name:{name_width}s}" + "".join(f"{summary.get(c, ''):>11}" for c in columns))
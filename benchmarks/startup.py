@@ -0,0 +1,48 @@
+"""Measures how long `import main` takes and how much memory it uses, as a fresh uvicorn worker would see it.
+
+Run it with `python -m benchmarks.startup --data-dir <dir with games_parquet>`. Each run is a new interpreter, so
+module caches from earlier runs do not hide import cost. RSS is read after the import and again after the game store
+has loaded its data.
+"""
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+PROBE = """
+import json, os, sys, time
+sys.path.insert(0, {root!r})
+def rss_mb():
+    with open('/proc/self/statm') as f:
+        return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2**20
+start = time.perf_counter()
+import main
+imported = time.perf_counter()
+import_rss = rss_mb()
+main.games.get()
+print(json.dumps({{"import_seconds": imported - start, "import_rss_mb": import_rss,
+                  "load_seconds": time.perf_counter() - imported, "loaded_rss_mb": rss_mb()}}))
+"""
+
+def measure(root, data_dir):
+    env = {**os.environ, "OPENAI_API_KEY": os.getenv("OPENAI_API_KEY", "unused"), "SCOUT_WARMUP": "lazy"}
+    output = subprocess.run([sys.executable, "-c", PROBE.format(root=root)], cwd=data_dir, env=env,
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def main(data_dir, runs):
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    results = [measure(root, data_dir) for _ in range(runs)]
+    for key in results[0]:
+        values = [result[key] for result in results]
+        unit = "s" if key.endswith("seconds") else " MB"
+        print(f"{key:16s} median {statistics.median(values):8.2f}{unit}   min {min(values):8.2f}{unit}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure main.py import time and memory in fresh interpreters.")
+    parser.add_argument("--data-dir", default=".", help="Directory containing games_parquet or all_games.csv.")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+    main(args.data_dir, args.runs)
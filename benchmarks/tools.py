@@ -0,0 +1,88 @@
+"""Micro-benchmarks for every function in main.available_tools.
+
+Run it with `python -m benchmarks.tools --data-dir <dir with all_games.csv or games_parquet>`, for example on a file from
+benchmarks.generate_games. Arguments are sampled from the loaded games (real player names, seasons and opponents), and
+the tool functions are called directly, so the tool cache in front of them does not hide their cost. Tools that return
+an error for every call, like search_game_summaries without a chroma_db, are reported but not timed.
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+from benchmarks.report import summarize, print_table
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def argument_cases(data, rng):
+    """One argument generator per tool name; each call returns the kwargs for a single sampled invocation."""
+    players = data.df['player_name'].cat.categories.tolist()
+    seasons = data.df['season'].cat.categories.tolist()
+    teams = data.df['opponent'].cat.categories.tolist()
+
+    def player_seasons():
+        first = rng.randrange(len(seasons))
+        return ", ".join(seasons[first:first + rng.randint(1, 3)])
+
+    return {
+        "calculate_player_averages": lambda: {"player_name": rng.choice(players), "seasons": rng.choice(["", player_seasons()]), "opponent": rng.choice(["", rng.choice(teams)])},
+        "get_player_season_info": lambda: {"player_name": rng.choice(players)},
+        "compare_players_averages": lambda: {"player_a_name": rng.choice(players), "player_b_name": rng.choice(players), "seasons": rng.choice(["", player_seasons()])},
+        "get_player_career_high": lambda: {"player_name": rng.choice(players), "stat": rng.choice(["points", "rebounds", "assists", "blocks"])},
+        "get_player_stat_progression": lambda: {"player_name": rng.choice(players), "stats": "points, rebounds, assists"},
+        "find_top_performer_against_team": lambda: {"opponent_team": rng.choice(teams), "stat": rng.choice(["points", "rebounds", "assists"]), "season": rng.choice(["", rng.choice(seasons)]), "top_k": rng.choice([1, 5, 10]), "min_games": rng.choice([1, 3])},
+        "get_player_total_stats": lambda: {"player_name": rng.choice(players), "seasons": rng.choice(["", player_seasons()]), "game_type": rng.choice(["", "Regular Season", "Playoffs"])},
+        "search_game_summaries": lambda: {"query": f"big scoring night against {rng.choice(teams)}", "player_name": rng.choice(["", rng.choice(players)])},
+        "analyze_player_form": lambda: {"player_name": rng.choice(players), "analysis": rng.choice(["recent", "rolling", "best", "worst", "streak"]), "window": rng.choice([5, 10, 20])},
+    }
+
+def benchmark(function, make_args, calls):
+    latencies, errors = [], 0
+    for _ in range(calls):
+        kwargs = make_args()
+        start = time.perf_counter()
+        result = function(**kwargs)
+        latencies.append(time.perf_counter() - start)
+        errors += result.startswith("An error occurred")
+    return latencies, errors
+
+def main(data_dir, calls, seed, output):
+    os.chdir(data_dir)
+    sys.path.insert(0, ROOT)
+    os.environ.setdefault("OPENAI_API_KEY", "unused")
+    os.environ["SCOUT_WARMUP"] = "lazy"
+    import main as scout
+
+    start = time.perf_counter()
+    data = scout.games.get()
+    print(f"Loaded {len(data.df)} games in {time.perf_counter() - start:.2f}s.")
+    rng = random.Random(seed)
+    cases = argument_cases(data, rng)
+    rows, results = [], {}
+    for name, function in scout.available_tools.items():
+        if name not in cases:
+            print(f"{name}: no benchmark case, skipped")
+            continue
+        function(**cases[name]())
+        latencies, errors = benchmark(function, cases[name], calls)
+        if errors == calls:
+            print(f"{name}: every call returned an error, skipped")
+            continue
+        summary = summarize(latencies)
+        summary["errors"] = errors
+        rows.append((name, summary))
+        results[name] = summary
+    print_table(rows)
+    if output:
+        with open(output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark each scouting tool against a games file.")
+    parser.add_argument("--data-dir", default=".", help="Directory containing games_parquet or all_games.csv.")
+    parser.add_argument("--calls", type=int, default=200, help="Timed calls per tool, after one warm-up call.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="Also write the results to this file.")
+    args = parser.parse_args()
+    main(os.path.abspath(args.data_dir), args.calls, args.seed, args.json and os.path.abspath(args.json))
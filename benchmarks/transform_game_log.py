@@ -0,0 +1,58 @@
+"""Micro-benchmark for data_ingestion.transform_game_log against the original iterrows() loop.
+
+Run it with `python -m benchmarks.transform_game_log`. Game logs come from the NBA stats stub, so the frames have the
+same columns and dtypes as the real PlayerGameLog responses. Both versions must produce identical output.
+"""
+import time
+import argparse
+import pandas as pd
+from data_ingestion import CSV_HEADERS, transform_game_log
+from benchmarks.nba_stats_stub import CURRENT_SEASON_YEAR, GAME_LOG_HEADERS, game_log_rows
+
+def transform_game_log_iterrows(game_log_df, player_id, player_name, season):
+    all_docs, all_metadatas, structured_games = [], [], []
+    for _, row in game_log_df.iterrows():
+        all_docs.append(f"In {season}, vs {row['MATCHUP'].split(' ')[-1]}, {player_name} had {row['PTS']}p, {row['REB']}r, {row['AST']}a, {row['STL']}s, {row['BLK']}b. +/- was {row['PLUS_MINUS']}.")
+        all_metadatas.append({"player_name": player_name, "season": season, "opponent": row['MATCHUP'].split(' ')[-1]})
+        structured_games.append({h: row.get(h.upper()) for h in CSV_HEADERS})
+        structured_games[-1].update({'player_id': player_id, 'player_name': player_name, 'season': season, 'game_id': row['Game_ID'], 'opponent': row['MATCHUP'].split(' ')[-1]})
+    return all_docs, all_metadatas, structured_games
+
+def season_frames(players):
+    frames = []
+    for player_id in range(1, players + 1):
+        for year in range(CURRENT_SEASON_YEAR - 20, CURRENT_SEASON_YEAR + 1):
+            season = f"{year}-{str(year+1)[-2:]}"
+            rows = game_log_rows(player_id, season)
+            if rows:
+                frames.append((player_id, f"Player {player_id}", season, pd.DataFrame(rows, columns=GAME_LOG_HEADERS)))
+    return frames
+
+def timed(transform, frames, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for player_id, player_name, season, df in frames:
+            transform(df, player_id, player_name, season)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main(players, repeat):
+    frames = season_frames(players)
+    for player_id, player_name, season, df in frames:
+        expected = transform_game_log_iterrows(df, player_id, player_name, season)
+        assert repr(transform_game_log(df, player_id, player_name, season)) == repr(expected), (player_name, season)
+    games = sum(len(df) for *_, df in frames)
+    print(f"{len(frames)} season logs, {games} games (outputs identical)")
+    baseline = timed(transform_game_log_iterrows, frames, repeat)
+    vectorized = timed(transform_game_log, frames, repeat)
+    print(f"iterrows:   {baseline * 1000:8.1f} ms  ({baseline / games * 1e6:.2f} us/game)")
+    print(f"vectorized: {vectorized * 1000:8.1f} ms  ({vectorized / games * 1e6:.2f} us/game)")
+    print(f"speedup:    {baseline / vectorized:8.1f}x")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the game-log transformation used by data_ingestion.py.")
+    parser.add_argument("--players", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    main(args.players, args.repeat)
@@ -1,43 +1,146 @@
 import time
 import json
+import random
+import argparse
+import threading
+import queue
 import os
 import shutil
 import chromadb
 import requests
+import numpy as np
 import pandas as pd
 from nba_api.stats.static import players
-from nba_api.stats.endpoints import playergamelog, commonplayerinfo
+from nba_api.stats.endpoints import playergamelog, commonplayerinfo, leaguegamelog
+from nba_api.stats.library.http import NBAStatsHTTP
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import partial
 from sentence_transformers import SentenceTransformer
 from datetime import datetime
+from game_store import CSV_HEADERS, append_games, compact_games, convert_csv, publish_snapshot, read_games
 
 PROGRESS_FILE = 'progress.json'
 CSV_DATABASE = 'all_games.csv'
+GAMES_DATASET = 'games_parquet'
 DB_PATH = "./chroma_db"
+MAX_ATTEMPTS = 5
+COMPACT_AFTER_FILES = 64
+EMBED_BATCH_SIZE = 256
+PIPELINE_QUEUE_SIZE = 64
+BASE_BACKOFF_SECONDS = 2
+MAX_BACKOFF_SECONDS = 60
 
-CSV_HEADERS = [
-    'player_id', 'player_name', 'season', 'game_id', 'opponent', 'pts', 'reb', 'ast', 
-    'plus_minus', 'blk', 'stl', 'tov', 'pf', 'fgm', 'fga', 'fg3m', 'fg3a'
-]
+if os.getenv("NBA_STATS_BASE_URL"):
+    NBAStatsHTTP.base_url = os.getenv("NBA_STATS_BASE_URL").rstrip('/') + "/{endpoint}"
 
-def load_progress():
+class RateLimiter:
+    """Token bucket shared by all fetch workers: `rate` requests per second with bursts of up to `burst`."""
+
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait_time = (1 - self._tokens) / self.rate
+            time.sleep(wait_time)
+
+def call_with_retries(limiter, description, request):
+    """Runs `request` behind the rate limiter, retrying network errors with exponential backoff and full jitter."""
+    for attempt in range(MAX_ATTEMPTS):
+        limiter.acquire()
+        try:
+            return request()
+        except requests.exceptions.RequestException:
+            if attempt == MAX_ATTEMPTS - 1:
+                raise
+            wait_time = random.uniform(0, min(MAX_BACKOFF_SECONDS, BASE_BACKOFF_SECONDS * 2 ** attempt))
+            print(f"    - Network error for {description}. Retrying in {wait_time:.1f}s...")
+            time.sleep(wait_time)
+
+def load_progress(all_players):
+    """Returns (completed player ids, per-player watermarks), upgrading the old next_player_index format."""
     if os.path.exists(PROGRESS_FILE):
         with open(PROGRESS_FILE, 'r') as f:
-            try: return json.load(f)['next_player_index']
-            except (json.JSONDecodeError, KeyError): return 0
-    return 0
+            try: progress = json.load(f)
+            except json.JSONDecodeError: return set(), {}
+        watermarks = {int(player_id): mark for player_id, mark in progress.get('watermarks', {}).items()}
+        if 'completed_players' in progress:
+            return set(progress['completed_players']), watermarks
+        return {player['id'] for player in all_players[:progress.get('next_player_index', 0)]}, watermarks
+    return set(), {}
+
+def save_progress(completed_players, watermarks):
+    with open(PROGRESS_FILE + '.tmp', 'w') as f:
+        json.dump({'completed_players': sorted(completed_players), 'watermarks': {str(k): v for k, v in sorted(watermarks.items())}}, f)
+    os.replace(PROGRESS_FILE + '.tmp', PROGRESS_FILE)
+
+def current_season():
+    now = datetime.now()
+    year = now.year if now.month >= 10 else now.year - 1
+    return f"{year}-{str(year+1)[-2:]}"
+
+def advance_watermark(watermark, games):
+    """Moves a player's (season, game_id) watermark past the newest of `games`."""
+    if not games:
+        return watermark
+    latest = max((game['season'], game['game_id']) for game in games)
+    if watermark and (watermark['season'], watermark['game_id']) >= latest:
+        return watermark
+    return {'season': latest[0], 'game_id': latest[1]}
 
-def save_progress(index):
-    with open(PROGRESS_FILE, 'w') as f:
-        json.dump({'next_player_index': index}, f)
+def watermarks_from_dataset():
+    """Derives watermarks for databases built before progress.json tracked them."""
+    df = read_games(GAMES_DATASET, columns=['player_id', 'season', 'game_id']).astype({'season': str, 'game_id': str})
+    # Sorting on the (season, game_id) pair keeps each player's newest season and game together.
+    latest = df.sort_values(['season', 'game_id'], kind='stable').groupby('player_id', sort=False).tail(1)
+    return {int(player_id): {'season': season, 'game_id': game_id} for player_id, season, game_id in latest.itertuples(index=False)}
 
-def fetch_player_data(player_id, player_name):
+def transform_game_log(game_log_df, player_id, player_name, season):
+    # Column-wise equivalent of building one document, metadata dict and CSV row per iterrows() row. Values come
+    # from .values like iterrows() does, so every stat keeps the exact Python type (and text form) it had before.
+    count = len(game_log_df)
+    if count == 0: return [], [], []
+    values = dict(zip(game_log_df.columns, game_log_df.values.T))
+    opponents = [matchup.split(' ')[-1] for matchup in values['MATCHUP']]
+    all_docs = [
+        f"In {season}, vs {opp}, {player_name} had {pts}p, {reb}r, {ast}a, {stl}s, {blk}b. +/- was {pm}."
+        for opp, pts, reb, ast, stl, blk, pm in zip(opponents, *(values[c] for c in ('PTS', 'REB', 'AST', 'STL', 'BLK', 'PLUS_MINUS')))
+    ]
+    all_metadatas = [{"player_name": player_name, "season": season, "opponent": opp} for opp in opponents]
+    columns = {h: values.get(h.upper(), [None] * count) for h in CSV_HEADERS}
+    columns.update({'player_id': [player_id] * count, 'player_name': [player_name] * count, 'season': [season] * count,
+                    'game_id': values['Game_ID'], 'opponent': opponents})
+    structured_games = [dict(zip(columns, row)) for row in zip(*columns.values())]
+    return all_docs, all_metadatas, structured_games
+
+def fetch_season_games(player_id, player_name, season, limiter):
+    game_log_df = call_with_retries(
+        limiter, f"{player_name} {season}",
+        lambda: playergamelog.PlayerGameLog(player_id=player_id, season=season, timeout=60).get_data_frames()[0],
+    )
+    return transform_game_log(game_log_df, player_id, player_name, season)
+
+def fetch_player_data(player_id, player_name, limiter):
     all_docs, all_metadatas, structured_games = [], [], []
     try:
-        player_info_df = commonplayerinfo.CommonPlayerInfo(player_id=player_id, timeout=60).get_data_frames()[0]
+        player_info_df = call_with_retries(
+            limiter, f"{player_name} info",
+            lambda: commonplayerinfo.CommonPlayerInfo(player_id=player_id, timeout=60).get_data_frames()[0],
+        )
         from_year, to_year_from_api = int(player_info_df['FROM_YEAR'].iloc[0]), int(player_info_df['TO_YEAR'].iloc[0])
         
-        current_year, current_month = datetime.now().year, datetime.now().month
-        latest_season_start_year = current_year if current_month >= 10 else current_year - 1
+        latest_season_start_year = int(current_season()[:4])
         effective_to_year = min(to_year_from_api, latest_season_start_year)
 
         active_seasons = []
@@ -46,34 +149,147 @@ def fetch_player_data(player_id, player_name):
 
         if not active_seasons: return [], [], []
         
-        print(f"    - Fetching {len(active_seasons)} valid season(s)...")
+        print(f"    - {player_name}: fetching {len(active_seasons)} valid season(s)...")
 
         for season in active_seasons:
-            for attempt in range(3):
-                try:
-                    time.sleep(1)
-                    game_log_df = playergamelog.PlayerGameLog(player_id=player_id, season=season, timeout=60).get_data_frames()[0]
-                    if not game_log_df.empty:
-                        for _, row in game_log_df.iterrows():
-                            all_docs.append(f"In {season}, vs {row['MATCHUP'].split(' ')[-1]}, {player_name} had {row['PTS']}p, {row['REB']}r, {row['AST']}a, {row['STL']}s, {row['BLK']}b. +/- was {row['PLUS_MINUS']}.")
-                            all_metadatas.append({"player_name": player_name, "season": season, "opponent": row['MATCHUP'].split(' ')[-1]})
-                            structured_games.append({h: row.get(h.upper()) for h in CSV_HEADERS})
-                            structured_games[-1].update({'player_id': player_id, 'player_name': player_name, 'season': season, 'game_id': row['Game_ID'], 'opponent': row['MATCHUP'].split(' ')[-1]})
-                    break 
-                except requests.exceptions.RequestException as e:
-                    wait_time = 10 * (attempt + 1)
-                    print(f"    - Network error for {season}. Retrying in {wait_time}s...")
-                    time.sleep(wait_time)
-            else:
-                print(f"    - Failed to fetch data for season {season} after multiple retries.")
+            docs, metadatas, games = fetch_season_games(player_id, player_name, season, limiter)
+            all_docs += docs
+            all_metadatas += metadatas
+            structured_games += games
         
         return all_docs, all_metadatas, structured_games
     except Exception as e:
         print(f"    - A critical error occurred for {player_name}: {e}")
-        return [], [], []
+        return None
+
+def stored_game_ids():
+    """Maps each player id to the game ids already in the game dataset, for deduplicating re-fetched games."""
+    df = read_games(GAMES_DATASET, columns=['player_id', 'game_id'])
+    return df.astype({'game_id': str}).groupby('player_id')['game_id'].agg(set).to_dict()
+
+def embed_batches(model, send, receive):
+    """Embedding stage: collects fetched players' documents into fixed-size encode batches that span players.
+
+    A player is handed to the writer, together with its embeddings, once all of its documents have been encoded.
+    The last partial batch is only encoded once the fetchers are done (`receive()` returns None).
+    """
+    entries, documents, vectors = [], [], []
+    while True:
+        entry = receive()
+        if entry is not None:
+            entries.append(entry)
+            documents += entry['documents']
+        # Only whole batches of not-yet-encoded documents, so every encode call splits into full-size batches.
+        pending = len(documents) - len(vectors)
+        ready = len(documents) if entry is None else len(vectors) + pending - pending % EMBED_BATCH_SIZE
+        if ready > len(vectors):
+            vectors.extend(model.encode(documents[len(vectors):ready], batch_size=EMBED_BATCH_SIZE, show_progress_bar=False))
+        released, used = 0, 0
+        while released < len(entries) and used + len(entries[released]['documents']) <= len(vectors):
+            used += len(entries[released]['documents'])
+            released += 1
+        if released:
+            send((entries[:released], vectors[:used]))
+            entries, documents, vectors = entries[released:], documents[used:], vectors[used:]
+        if entry is None:
+            send(None)
+            return
 
-def main():
-    """Main function to build all databases from scratch, with corrected API calls."""
+def write_batches(client, collection, completed, watermarks, receive):
+    """Writer stage: bulk-upserts each embedded batch into Chroma, writes its games, then commits progress for it."""
+    max_batch = client.get_max_batch_size()
+    while (item := receive()) is not None:
+        entries, vectors = item
+        ids = [f"{entry['player']['id']}_{game['game_id']}" for entry in entries for game in entry['games']]
+        documents = [document for entry in entries for document in entry['documents']]
+        metadatas = [metadata for entry in entries for metadata in entry['metadatas']]
+        for start in range(0, len(ids), max_batch):
+            collection.upsert(embeddings=np.asarray(vectors[start:start + max_batch]), documents=documents[start:start + max_batch],
+                              metadatas=metadatas[start:start + max_batch], ids=ids[start:start + max_batch])
+        for entry in entries:
+            if entry['games']:
+                append_games(GAMES_DATASET, pd.DataFrame(entry['games']), entry['part'])
+            completed.add(entry['player']['id'])
+            watermarks[entry['player']['id']] = advance_watermark(watermarks.get(entry['player']['id']), entry['games'])
+        save_progress(completed, watermarks)
+        print(f"    - Stored {len(entries)} player(s): {len(documents)} docs in the Vector DB and {sum(len(entry['games']) for entry in entries)} records in the game dataset.")
+
+def run_stage(stage, inbox, outbox, errors, *args):
+    # On failure, keep draining the inbox so upstream stages never block on a full queue, and still signal downstream.
+    finished = False
+    def receive():
+        nonlocal finished
+        item = inbox.get()
+        finished = item is None
+        return item
+    try:
+        stage(*args, receive=receive)
+    except Exception as e:
+        errors.append(e)
+        while not finished:
+            receive()
+        if outbox is not None:
+            outbox.put(None)
+
+def run_fetches(jobs, workers, completed, watermarks, seen_games=None):
+    """Runs `(player, fetch)` jobs as a pipeline: fetch workers -> cross-player embedding -> bulk store writes.
+
+    Fetching, embedding and writing overlap, and a player only counts as completed once its rows are in both stores.
+    With `seen_games`, games already stored for the player are dropped and the remaining ones are written to a new
+    part file named after the newest game, so incremental runs only ever append.
+    """
+    model = SentenceTransformer('paraphrase-MiniLM-L3-v2')
+    client = chromadb.PersistentClient(path=DB_PATH)
+    collection = client.get_or_create_collection(name="nba_scout")
+
+    fetched, embedded, errors = queue.Queue(maxsize=PIPELINE_QUEUE_SIZE), queue.Queue(maxsize=PIPELINE_QUEUE_SIZE), []
+    stages = [
+        threading.Thread(target=run_stage, args=(embed_batches, fetched, embedded, errors, model, embedded.put)),
+        threading.Thread(target=run_stage, args=(write_batches, embedded, None, errors, client, collection, completed, watermarks)),
+    ]
+    for stage in stages:
+        stage.start()
+
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(fetch): player for player, fetch in jobs}
+            for done, future in enumerate(as_completed(futures), start=1):
+                player = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    print(f"    - A critical error occurred for {player['full_name']}: {e}")
+                    result = None
+                if result is None:
+                    print(f"({done}/{len(jobs)}) Fetch failed; {player['full_name']} will be retried on the next run.")
+                    continue
+                documents, metadatas, games = result
+                part = f"player-{player['id']}"
+                if seen_games is not None:
+                    seen = seen_games.get(player['id'], set())
+                    new = [i for i, game in enumerate(games) if str(game['game_id']) not in seen]
+                    documents, metadatas, games = [documents[i] for i in new], [metadatas[i] for i in new], [games[i] for i in new]
+                    if games:
+                        part = f"player-{player['id']}-{max(str(game['game_id']) for game in games)}"
+                print(f"({done}/{len(jobs)}) Fetched {player['full_name']}: {len(games)} new game(s).")
+                fetched.put({'player': player, 'documents': documents, 'metadatas': metadatas, 'games': games, 'part': part})
+    finally:
+        fetched.put(None)
+        for stage in stages:
+            stage.join()
+    if errors:
+        raise errors[0]
+
+def publish_games():
+    """Publishes a fresh snapshot of the game data; web workers running in shared mode switch to it on their next request."""
+    try:
+        directory = publish_snapshot(GAMES_DATASET if os.path.isdir(GAMES_DATASET) else CSV_DATABASE)
+        print(f"Published game data snapshot '{directory}'.")
+    except Exception as e:
+        print(f"Could not publish a game data snapshot: {e}")
+
+def main(workers=4, rate=2.0):
+    """Main function to build all databases from scratch, fetching players concurrently behind a shared rate limit."""
     print("Starting Advanced Data Ingestion...")
     
     try:
@@ -82,46 +298,87 @@ def main():
         print(f"CRITICAL FAILURE: Could not get the initial list of players from the NBA API: {e}")
         return
 
-    start_index = load_progress()
-    if start_index == 0 and not os.path.exists(PROGRESS_FILE):
+    if not os.path.exists(PROGRESS_FILE):
         print("First run detected. Setting up fresh databases...")
-        if os.path.exists(CSV_DATABASE): os.remove(CSV_DATABASE)
+        if os.path.exists(GAMES_DATASET): shutil.rmtree(GAMES_DATASET)
         if os.path.exists(DB_PATH): shutil.rmtree(DB_PATH)
-        pd.DataFrame(columns=CSV_HEADERS).to_csv(CSV_DATABASE, index=False)
-        save_progress(0)
-        print("Fresh 'progress.json' and 'all_games.csv' created.")
+        os.makedirs(GAMES_DATASET)
+        save_progress(set(), {})
+        print(f"Fresh 'progress.json' and '{GAMES_DATASET}' created.")
     
-    start_index = load_progress() 
+    completed, watermarks = load_progress(all_players)
+    pending = [player for player in all_players if player['id'] not in completed]
     
-    print(f"Resuming from player {start_index + 1} of {len(all_players)}.")
+    print(f"{len(completed)} of {len(all_players)} players already stored; fetching {len(pending)} with {workers} worker(s) at {rate} requests/s.")
     
-    model = SentenceTransformer('paraphrase-MiniLM-L3-v2')
-    client = chromadb.PersistentClient(path=DB_PATH)
-    collection = client.get_or_create_collection(name="nba_scout")
-    doc_counter = collection.count()
+    limiter = RateLimiter(rate, burst=workers)
+    jobs = [(player, partial(fetch_player_data, player['id'], player['full_name'], limiter)) for player in pending]
+    run_fetches(jobs, workers, completed, watermarks)
+    compact_games(GAMES_DATASET)
+    publish_games()
+    if len(completed) < len(all_players):
+        print(f"\n {len(all_players) - len(completed)} player(s) failed; re-run to retry them.")
+    else:
+        print("\n All players have been processed!")
 
-    for i in range(start_index, len(all_players)):
-        player = all_players[i]
-        print(f"\n({i+1}/{len(all_players)}) Processing: {player['full_name']}...")
-        
-        documents, metadatas, games = fetch_player_data(player['id'], player['full_name'])
-        
-        if games:
-            if documents:
-                embeddings = model.encode(documents, show_progress_bar=False)
-                ids = [f"doc_{doc_counter + j}" for j in range(len(documents))]
-                collection.add(embeddings=embeddings, documents=documents, metadatas=metadatas, ids=ids)
-                doc_counter += len(documents)
-            
-            df = pd.DataFrame(games)
-            df.to_csv(CSV_DATABASE, mode='a', header=False, index=False)
-            print(f"    - Added {len(documents)} docs to Vector DB and {len(games)} records to CSV.")
-        else:
-            print(f"    - No new game data found. Skipping.")
-        
-        save_progress(i + 1)
-            
-    print("\n All players have been processed!")
+def update(workers=4, rate=2.0):
+    """Incremental refresh: fetches the current season only for players with games past their watermark."""
+    print("Starting incremental ingestion...")
+    if not os.path.exists(PROGRESS_FILE) or not os.path.isdir(GAMES_DATASET):
+        print("No existing databases found; run a full ingestion first.")
+        return
+
+    try:
+        all_players = players.get_active_players()
+    except Exception as e:
+        print(f"CRITICAL FAILURE: Could not get the initial list of players from the NBA API: {e}")
+        return
+
+    completed, watermarks = load_progress(all_players)
+    if not watermarks:
+        watermarks = watermarks_from_dataset()
+    season = current_season()
+    limiter = RateLimiter(rate, burst=workers)
+    try:
+        league_log = call_with_retries(
+            limiter, f"league game log {season}",
+            lambda: leaguegamelog.LeagueGameLog(season=season, player_or_team_abbreviation='P', timeout=60).get_data_frames()[0],
+        )
+    except Exception as e:
+        print(f"CRITICAL FAILURE: Could not get the {season} league game log: {e}")
+        return
+    latest_games = league_log.astype({'GAME_ID': str}).groupby('PLAYER_ID')['GAME_ID'].max().to_dict()
+
+    def has_new_games(player):
+        latest, mark = latest_games.get(player['id']), watermarks.get(player['id'])
+        return latest is not None and (mark is None or (season, latest) > (mark['season'], mark['game_id']))
+
+    pending = [player for player in all_players if player['id'] not in completed]
+    stale = [player for player in all_players if player['id'] in completed and has_new_games(player)]
+    print(f"{len(stale)} player(s) have new {season} games; {len(pending)} player(s) need a full fetch.")
+
+    jobs = [(player, partial(fetch_player_data, player['id'], player['full_name'], limiter)) for player in pending]
+    jobs += [(player, partial(fetch_season_games, player['id'], player['full_name'], season, limiter)) for player in stale]
+    run_fetches(jobs, workers, completed, watermarks, seen_games=stored_game_ids())
+    compact_games(GAMES_DATASET, min_files=COMPACT_AFTER_FILES)
+    publish_games()
+    print("\n Incremental refresh complete!")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Build the NBA game dataset and vector store.")
+    parser.add_argument('--convert-csv', action='store_true', help=f"Convert an existing {CSV_DATABASE} into the {GAMES_DATASET} parquet dataset and exit.")
+    parser.add_argument('--incremental', action='store_true', help="Only fetch games played since the last run and append them.")
+    parser.add_argument('--publish', action='store_true', help="Publish a snapshot of the existing game data for shared-mode web workers and exit.")
+    parser.add_argument('--workers', type=int, default=4, help="Number of players fetched concurrently.")
+    parser.add_argument('--rate', type=float, default=2.0, help="Maximum NBA API requests per second across all workers.")
+    args = parser.parse_args()
+    if args.convert_csv:
+        rows = convert_csv(CSV_DATABASE, GAMES_DATASET)
+        print(f"Converted {rows} rows from '{CSV_DATABASE}' into '{GAMES_DATASET}'.")
+        publish_games()
+    elif args.publish:
+        publish_games()
+    elif args.incremental:
+        update(workers=args.workers, rate=args.rate)
+    else:
+        main(workers=args.workers, rate=args.rate)
\ No newline at end of file
@@ -0,0 +1,658 @@
+import os
+import json
+import time
+import shutil
+import threading
+from contextlib import contextmanager
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.ipc
+import pyarrow.parquet as pq
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+CATEGORY_COLUMNS = ['player_name', 'season', 'opponent', 'game_type']
+STAT_COLUMNS = ['pts', 'reb', 'ast', 'plus_minus', 'blk', 'stl', 'tov', 'pf', 'fgm', 'fga', 'fg3m', 'fg3a']
+CUBE_STATS = ['pts', 'reb', 'ast', 'blk', 'stl', 'tov', 'plus_minus', 'fgm', 'fga', 'fg3m', 'fg3a']
+CSV_HEADERS = [
+    'player_id', 'player_name', 'season', 'game_id', 'opponent', 'pts', 'reb', 'ast',
+    'plus_minus', 'blk', 'stl', 'tov', 'pf', 'fgm', 'fga', 'fg3m', 'fg3a'
+]
+TEAMS = ['ATL', 'BOS', 'BKN', 'CHA', 'CHI', 'CLE', 'DAL', 'DEN', 'DET', 'GSW', 'HOU', 'IND', 'LAC', 'LAL', 'MEM',
+         'MIA', 'MIL', 'MIN', 'NOP', 'NYK', 'OKC', 'ORL', 'PHI', 'PHX', 'POR', 'SAC', 'SAS', 'TOR', 'UTA', 'WAS']
+CSV_DTYPES = {'player_name': str, 'season': str, 'game_id': str, 'opponent': str}
+_NO_ROWS = np.empty(0, dtype=np.intp)
+SNAPSHOT_SUFFIX = '.snapshot'
+
+COLUMN_TYPES = {
+    'player_id': pa.int64(), 'player_name': pa.string(), 'season': pa.string(), 'game_id': pa.string(),
+    'opponent': pa.string(), 'game_type': pa.string(), **{stat: pa.int16() for stat in STAT_COLUMNS}
+}
+SEASON_PARTITIONING = ds.HivePartitioning.discover(infer_dictionary=True)
+PARQUET_FORMAT = ds.ParquetFileFormat(read_options=ds.ParquetReadOptions(dictionary_columns=['player_name', 'opponent', 'game_type']))
+
+def source_files(path):
+    """Maps every data file behind `path` to its (mtime, size), so callers can tell what changed since the last load."""
+    if not os.path.isdir(path):
+        files = [path]
+    else:
+        files = [os.path.join(root, name) for root, _, names in os.walk(path) for name in names if name.endswith('.parquet')]
+    return {f: (stat.st_mtime_ns, stat.st_size) for f, stat in ((f, os.stat(f)) for f in files)}
+
+def _partition_dir(path, season):
+    return os.path.join(path, f"season={season}")
+
+def append_games(path, df, part):
+    """Writes one parquet file per season for `df` under the dataset at `path`, replacing any earlier file with the same part name."""
+    columns = [c for c in df.columns if c in COLUMN_TYPES and c != 'season']
+    schema = pa.schema([(c, COLUMN_TYPES[c]) for c in columns])
+    for season, season_df in df.groupby('season', sort=False, observed=True):
+        os.makedirs(_partition_dir(path, season), exist_ok=True)
+        table = pa.Table.from_pandas(season_df[columns], schema=schema, preserve_index=False).replace_schema_metadata(None)
+        staging = os.path.join(_partition_dir(path, season), f"_{part}.tmp")
+        pq.write_table(table, staging, compression='zstd')
+        os.replace(staging, os.path.join(_partition_dir(path, season), f"{part}.parquet"))
+
+def _finish_compaction(partition):
+    """Removes parts that a compacted file already holds, in case a compaction stopped before deleting them."""
+    for f in sorted(f for f in os.listdir(partition) if f.startswith('compacted-') and f.endswith('.parquet')):
+        metadata = pq.read_schema(os.path.join(partition, f)).metadata or {}
+        for part, mtime in json.loads(metadata.get(b'compacted_from', b'{}')).items():
+            part_path = os.path.join(partition, part)
+            if os.path.exists(part_path) and os.stat(part_path).st_mtime_ns == mtime:
+                os.remove(part_path)
+
+def compact_games(path, min_files=2):
+    """Rewrites every season partition of the dataset at `path` holding at least `min_files` files as a single parquet file.
+
+    The compacted file gets a new, unique name and records the parts it replaces, which are only deleted once it is in
+    place; if that is interrupted, the next compaction finishes the job.
+    """
+    for entry in sorted(os.listdir(path)):
+        partition = os.path.join(path, entry)
+        if not os.path.isdir(partition):
+            continue
+        _finish_compaction(partition)
+        parts = sorted(f for f in os.listdir(partition) if f.endswith('.parquet'))
+        if len(parts) < max(min_files, 2):
+            continue
+        compacted_from = {f: os.stat(os.path.join(partition, f)).st_mtime_ns for f in parts}
+        table = ds.dataset([os.path.join(partition, f) for f in parts], format='parquet').to_table()
+        table = table.replace_schema_metadata({'compacted_from': json.dumps(compacted_from)})
+        name = f"compacted-{time.time_ns()}"
+        pq.write_table(table, os.path.join(partition, f"_{name}.tmp"), compression='zstd')
+        os.replace(os.path.join(partition, f"_{name}.tmp"), os.path.join(partition, f"{name}.parquet"))
+        for f in parts:
+            os.remove(os.path.join(partition, f))
+
+def convert_csv(csv_path, path):
+    """One-shot conversion of a legacy all_games.csv into a season-partitioned parquet dataset."""
+    df = pd.read_csv(csv_path, dtype=CSV_DTYPES)
+    append_games(path, df, 'part-0')
+    return len(df)
+
+def read_games(path, columns=None, seasons=None, files=None):
+    """Reads the game table from a parquet dataset or a CSV, pruning to `columns` and `seasons` where the format allows it.
+
+    `files` restricts a dataset read to those parquet files, which is how newly appended parts are picked up.
+    """
+    if not os.path.isdir(path):
+        df = pd.read_csv(path, usecols=columns, dtype=CSV_DTYPES)
+        return df[df['season'].isin(seasons)] if seasons else df
+    if files is not None:
+        dataset = ds.dataset(sorted(files), format=PARQUET_FORMAT, partitioning=SEASON_PARTITIONING, partition_base_dir=path)
+    else:
+        dataset = ds.dataset(path, format=PARQUET_FORMAT, partitioning=SEASON_PARTITIONING)
+    if not dataset.files:
+        return pd.DataFrame(columns=columns or [c for c in COLUMN_TYPES if c != 'game_type'])
+    if columns is None:
+        columns = [c for c in COLUMN_TYPES if c in dataset.schema.names]
+    season_filter = ds.field('season').isin(seasons) if seasons else None
+    return dataset.to_table(columns=columns, filter=season_filter).to_pandas()
+
+def compact_dtypes(df):
+    for col in df.columns.intersection(CATEGORY_COLUMNS):
+        df[col] = df[col].astype('category')
+        df[col] = df[col].cat.reorder_categories(df[col].cat.categories.sort_values())
+    for col in df.columns.intersection(STAT_COLUMNS):
+        if df[col].isna().any():
+            df[col] = df[col].astype('Int16')
+        elif df[col].dtype.itemsize > 2:
+            df[col] = pd.to_numeric(df[col], downcast='integer')
+    return df
+
+def _group_positions(key_codes, key_values, codes, values):
+    width = len(values) + 1
+    combined = key_codes.astype(np.int64) * width + codes + 1
+    order = np.argsort(combined, kind='stable')
+    sorted_combined = combined[order]
+    starts = np.flatnonzero(np.r_[len(combined) > 0, sorted_combined[1:] != sorted_combined[:-1]])
+    key_values, values = list(key_values), list(values)
+    groups = {}
+    for start, positions in zip(starts, np.split(order, starts[1:])):
+        k, c = divmod(int(sorted_combined[start]), width)
+        if k >= 0 and c > 0:
+            groups[(key_values[k], values[c - 1])] = positions
+    return groups
+
+def _player_keys(df):
+    names = df['player_name'].cat
+    key_of_name, key_values = pd.factorize(names.categories.str.lower())
+    return np.append(key_of_name, -1)[names.codes.to_numpy()], key_values
+
+def _concat_games(a, b):
+    df = pd.concat([a, b], ignore_index=True)
+    for col in df.columns.intersection(CATEGORY_COLUMNS):
+        if col in a and col in b:
+            df[col] = pd.api.types.union_categoricals([a[col], b[col]], sort_categories=True)
+    return compact_dtypes(df)
+
+def build_cube(df):
+    """Sums, non-null counts and game counts of CUBE_STATS per player_id x season x opponent (x game_type when present)."""
+    dims = ['player', 'season', 'opponent'] + (['game_type'] if 'game_type' in df else [])
+    stats = [s for s in CUBE_STATS if s in df]
+    frame = df[dims[1:] + stats].assign(player=df['player_id'])
+    grouped = frame.groupby(dims, observed=True, sort=True)
+    cube = grouped[stats].sum().astype('int64').join(grouped[stats].count().add_suffix('_count'))
+    cube.insert(0, 'games', grouped.size())
+    return cube.reset_index()
+
+def merge_cubes(a, b):
+    dims = [c for c in ['player', 'season', 'opponent', 'game_type'] if c in a]
+    cube = pd.concat([a, b], ignore_index=True)
+    for col in dims:
+        cube[col] = cube[col].astype('category')
+    return cube.groupby(dims, observed=True, sort=True).sum().reset_index()
+
+def build_leader_table(df):
+    """Game counts and per-stat sums, non-null counts and maxima per opponent x season x player."""
+    stats = [s for s in STAT_COLUMNS if s in df]
+    grouped = df.groupby(['opponent', 'season', 'player_name'], observed=True, sort=False)
+    table = pd.concat([
+        grouped.size().rename('games'), grouped[stats].sum().astype('int64').add_suffix('_sum'),
+        grouped[stats].count().add_suffix('_count'), grouped[stats].max().astype('float64').add_suffix('_max'),
+    ], axis=1)
+    return table.reset_index()
+
+def _combine_leader_rows(table, keys):
+    aggregations = {c: ('max' if c.endswith('_max') else 'sum') for c in table.columns if c not in keys + ['season']}
+    return table.groupby(keys, observed=True, sort=False).agg(aggregations).reset_index()
+
+def merge_leader_tables(a, b):
+    table = pd.concat([a, b], ignore_index=True)
+    for col in ['opponent', 'season', 'player_name']:
+        table[col] = table[col].astype(str)
+    return _combine_leader_rows(table, ['opponent', 'season', 'player_name'])
+
+def _runs(*columns):
+    changed = np.zeros(max(len(columns[0]) - 1, 0), dtype=bool)
+    for codes in columns:
+        changed |= codes[1:] != codes[:-1]
+    starts = np.flatnonzero(np.r_[len(columns[0]) > 0, changed])
+    return starts, np.append(starts[1:], len(columns[0]))
+
+def _frame_to_arrow(df):
+    """Encodes a frame so every column can be viewed again without copying once the file is memory-mapped.
+
+    Categoricals are stored as their codes with the categories in the field metadata, and nullable integers as their
+    values plus a separate byte mask column.
+    """
+    fields, arrays = [], []
+    for col in df.columns:
+        values = df[col].array
+        if isinstance(values, pd.Categorical):
+            arrays.append(pa.array(values.codes))
+            fields.append(pa.field(col, arrays[-1].type, metadata={'categories': json.dumps(values.categories.tolist())}))
+        elif isinstance(values, pd.arrays.IntegerArray):
+            arrays += [pa.array(values.to_numpy(dtype=values.dtype.numpy_dtype, na_value=0)), pa.array(values.isna().view(np.uint8))]
+            fields += [pa.field(col, arrays[-2].type, metadata={'mask': f'{col}.mask'}), pa.field(f'{col}.mask', pa.uint8())]
+        elif df[col].dtype.kind in 'biuf':
+            # Plain numpy numbers go in as-is: from_pandas would turn NaN into nulls, which cannot be viewed zero-copy.
+            arrays.append(pa.array(df[col].to_numpy()))
+            fields.append(pa.field(col, arrays[-1].type))
+        else:
+            arrays.append(pa.Array.from_pandas(values))
+            fields.append(pa.field(col, arrays[-1].type))
+    return pa.Table.from_arrays(arrays, schema=pa.schema(fields))
+
+def _view(column):
+    return column.chunk(0).to_numpy(zero_copy_only=True) if column.num_chunks == 1 else column.to_numpy()
+
+def _arrow_to_frame(table):
+    columns = {}
+    for field, column in zip(table.schema, table.columns):
+        metadata = field.metadata or {}
+        if field.name.endswith('.mask'):
+            continue
+        if b'categories' in metadata:
+            dtype = pd.CategoricalDtype(json.loads(metadata[b'categories']))
+            columns[field.name] = pd.Categorical.from_codes(_view(column), dtype=dtype, validate=False)
+        elif b'mask' in metadata:
+            columns[field.name] = pd.arrays.IntegerArray(_view(column), _view(table.column(metadata[b'mask'].decode())).view(bool))
+        elif pa.types.is_string(field.type) or pa.types.is_large_string(field.type):
+            columns[field.name] = column.to_pandas()
+        else:
+            columns[field.name] = _view(column)
+    return pd.DataFrame(columns, copy=False)
+
+def _write_arrow(path, table):
+    with pa.OSFile(path, 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+
+def _read_arrow(path):
+    # Uncompressed IPC read from a memory map: the returned buffers point straight into the (shared) page cache.
+    return pa.ipc.open_file(pa.memory_map(path)).read_all()
+
+class Leaderboards:
+    """Per (opponent, season, stat), players ranked by average (ties by name) with their game counts and single-game highs.
+
+    Season '' holds the all-time ranking against that opponent. Each stat has one array of leader-table rows ranked
+    board by board, and `boards` maps every (opponent, season, stat) to its slice of that array.
+    """
+
+    def __init__(self, table):
+        table = table.assign(**{c: table[c].astype(str) for c in ['opponent', 'season', 'player_name']})
+        all_time = _combine_leader_rows(table, ['opponent', 'player_name']).assign(season='')
+        table = pd.concat([table, all_time], ignore_index=True)
+        opponent_codes, opponent_values = pd.factorize(table['opponent'], sort=True)
+        season_codes, season_values = pd.factorize(table['season'], sort=True)
+        name_codes, name_values = pd.factorize(table['player_name'], sort=True)
+        base_order = np.lexsort((name_codes, season_codes, opponent_codes))
+        group_keys = (opponent_codes * (season_codes.max(initial=0) + 1) + season_codes)[base_order]
+        self.names, self.name_codes = name_values.tolist(), name_codes
+        self.games = table['games'].to_numpy(dtype=np.int64)
+        self.means, self.maxes, self.ranked, self.boards = {}, {}, {}, {}
+        for stat in [c[:-len('_sum')] for c in table.columns if c.endswith('_sum')]:
+            counts = table[f'{stat}_count'].to_numpy(dtype=np.int64)
+            self.means[stat] = table[f'{stat}_sum'].to_numpy(dtype=np.float64) / np.maximum(counts, 1)
+            self.maxes[stat] = table[f'{stat}_max'].to_numpy(dtype=np.float64)
+            valid = counts[base_order] > 0
+            ranked = np.lexsort((-self.means[stat][base_order][valid], group_keys[valid]))
+            self.ranked[stat], keys = base_order[valid][ranked], group_keys[valid][ranked]
+            for start, stop in zip(*_runs(keys)):
+                row = self.ranked[stat][start]
+                self.boards[(opponent_values[opponent_codes[row]], season_values[season_codes[row]], stat)] = slice(start, stop)
+
+    def write_snapshot(self, directory):
+        count = len(self.games)
+        columns = {'player_name': pa.array(self.name_codes), 'games': pa.array(self.games)}
+        for stat in self.means:
+            columns.update({f'{stat}_mean': pa.array(self.means[stat]), f'{stat}_max': pa.array(self.maxes[stat]),
+                            f'{stat}_rank': pa.array(np.r_[self.ranked[stat], np.full(count - len(self.ranked[stat]), -1)])})
+        table = pa.table(columns).replace_schema_metadata({'names': json.dumps(self.names), 'stats': json.dumps(list(self.means))})
+        _write_arrow(os.path.join(directory, 'leaders.arrow'), table)
+        keys = list(self.boards)
+        _write_arrow(os.path.join(directory, 'boards.arrow'), pa.table({
+            'opponent': [k[0] for k in keys], 'season': [k[1] for k in keys], 'stat': [k[2] for k in keys],
+            'start': [self.boards[k].start for k in keys], 'stop': [self.boards[k].stop for k in keys],
+        }))
+
+    @classmethod
+    def load_snapshot(cls, directory):
+        leaders = _read_arrow(os.path.join(directory, 'leaders.arrow'))
+        boards = _read_arrow(os.path.join(directory, 'boards.arrow')).to_pydict()
+        self = cls.__new__(cls)
+        self.names = json.loads(leaders.schema.metadata[b'names'])
+        self.name_codes, self.games = _view(leaders.column('player_name')), _view(leaders.column('games'))
+        stats = json.loads(leaders.schema.metadata[b'stats'])
+        self.means = {stat: _view(leaders.column(f'{stat}_mean')) for stat in stats}
+        self.maxes = {stat: _view(leaders.column(f'{stat}_max')) for stat in stats}
+        self.ranked = {stat: _view(leaders.column(f'{stat}_rank')) for stat in stats}
+        self.boards = {
+            (opponent, season, stat): slice(start, stop)
+            for opponent, season, stat, start, stop in zip(boards['opponent'], boards['season'], boards['stat'], boards['start'], boards['stop'])
+        }
+        return self
+
+    def top(self, opponent, season, stat, k=1, min_games=1):
+        board = self.boards.get((opponent, season, stat))
+        if board is None:
+            return None
+        rows = self.ranked[stat][board]
+        if min_games > 1:
+            rows = rows[self.games[rows] >= min_games]
+        means, maxes = self.means[stat], self.maxes[stat]
+        return [(self.names[self.name_codes[i]], means[i], int(self.games[i]), int(maxes[i])) for i in rows[:k]]
+
+class StatTimeline:
+    """One player's games in chronological order with prefix sums of a stat, so any N-game window costs O(1).
+
+    Games are ordered by (season, game_id). Missing values are skipped: a window averages the games that recorded
+    the stat, and they never count towards a streak.
+    """
+
+    def __init__(self, games, stat):
+        self.games = games.sort_values(['season', 'game_id'], kind='stable')
+        self.values = self.games[stat].to_numpy(dtype=np.float64, na_value=np.nan)
+        present = ~np.isnan(self.values)
+        self.sums = np.r_[0, np.cumsum(np.where(present, self.values, 0))]
+        self.counts = np.r_[0, np.cumsum(present)]
+
+    def __len__(self):
+        return len(self.values)
+
+    def game(self, i):
+        row = self.games.iloc[i]
+        return {"season": str(row['season']), "game_id": str(row['game_id']), "opponent": str(row['opponent'])}
+
+    def average(self, start, stop):
+        """Average over games [start, stop), or None if none of them recorded the stat."""
+        count = self.counts[stop] - self.counts[start]
+        return (self.sums[stop] - self.sums[start]) / count if count else None
+
+    def rolling(self, n):
+        """Average of every n-game window; element i covers games [i, i + n). NaN where no game recorded the stat."""
+        counts = self.counts[n:] - self.counts[:-n]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return (self.sums[n:] - self.sums[:-n]) / counts
+
+    def extreme_window(self, n, worst=False):
+        """Start index of the best (or worst) n-game window, earliest on ties; None if no window has data."""
+        averages = self.rolling(n)
+        if np.isnan(averages).all():
+            return None
+        return int(np.nanargmin(averages) if worst else np.nanargmax(averages))
+
+    def streaks(self, threshold):
+        """Returns ((start, stop) of the longest run of games at or above `threshold`, or None; length of the current run)."""
+        hits = np.r_[False, self.values >= threshold, False]
+        edges = np.flatnonzero(hits[1:] != hits[:-1])
+        starts, stops = edges[::2], edges[1::2]
+        if not len(starts):
+            return None, 0
+        longest = int(np.argmax(stops - starts))
+        current = int(stops[-1] - starts[-1]) if stops[-1] == len(self.values) else 0
+        return (int(starts[longest]), int(stops[longest])), current
+
+class GameData:
+    """A loaded game table, sorted by player, with row indexes for player-scoped lookups and an aggregate cube.
+
+    Rows are sorted by lowercased name and then player_id, so every player_id owns one contiguous run of rows and
+    every name the runs of its player_ids. Lookups go name -> player_ids -> rows, and the cube is keyed by player_id.
+
+    `write_snapshot`/`load_snapshot` round-trip everything but the per-process dict indexes through Arrow IPC files,
+    so processes that load the same snapshot share its pages instead of each holding a copy.
+    """
+
+    def __init__(self, df, cube=None, leader_table=None):
+        key_codes, key_values = _player_keys(df)
+        order = np.lexsort((df['player_id'].to_numpy(), key_codes))
+        self.df = df.iloc[order].reset_index(drop=True)
+        self._index_rows(key_codes[order], key_values)
+        self.cube = build_cube(self.df) if cube is None else cube
+        cube_dims = [d for d in ['player', 'season', 'opponent', 'game_type'] if d in self.cube]
+        self._index_cube(
+            {d: self.cube[d].astype('category').array for d in cube_dims},
+            [c for c in self.cube.columns if c not in cube_dims], self.cube[[c for c in self.cube.columns if c not in cube_dims]].to_numpy(dtype=np.int64),
+        )
+        self.leader_table = build_leader_table(self.df) if leader_table is None else leader_table
+        self.leaderboards = Leaderboards(self.leader_table)
+
+    def _index_rows(self, key_codes, key_values):
+        key_values = key_values.tolist()
+        player_ids = self.df['player_id'].to_numpy()
+        self.player_id_rows, self.player_ids = {}, {}
+        for start, stop in zip(*_runs(key_codes, player_ids)):
+            if key_codes[start] >= 0:
+                self.player_id_rows[int(player_ids[start])] = slice(start, stop)
+                self.player_ids.setdefault(key_values[key_codes[start]], []).append(int(player_ids[start]))
+        self.season_rows = _group_positions(key_codes, key_values, self.df['season'].array.codes, self.df['season'].cat.categories)
+        self.opponent_rows = _group_positions(key_codes, key_values, self.df['opponent'].array.codes, self.df['opponent'].cat.categories)
+
+    def _index_cube(self, dims, measures, values):
+        players = dims.pop('player')
+        player_ids = players.categories.tolist()
+        self.cube_rows = {player_ids[players.codes[start]]: slice(start, stop) for start, stop in zip(*_runs(players.codes))}
+        self._cube_dims = {d: (dims[d].codes, dims[d].categories.tolist()) for d in dims}
+        self._cube_measures = measures
+        self._cube_values = values
+
+    def write_snapshot(self, directory):
+        """Writes the sorted games, the cube and the leaderboards under `directory` as memory-mappable Arrow files."""
+        os.makedirs(directory)
+        _write_arrow(os.path.join(directory, 'games.arrow'), _frame_to_arrow(self.df))
+        dims = [d for d in ['player', 'season', 'opponent', 'game_type'] if d in self.cube]
+        cube = _frame_to_arrow(self.cube[dims].astype('category'))
+        values = pa.FixedSizeListArray.from_arrays(pa.array(self._cube_values.ravel()), len(self._cube_measures))
+        metadata = {'measures': json.dumps(self._cube_measures), 'player': 'player_id'}
+        cube = cube.append_column('values', values).replace_schema_metadata(metadata)
+        _write_arrow(os.path.join(directory, 'cube.arrow'), cube)
+        _write_arrow(os.path.join(directory, 'leader_table.arrow'), _frame_to_arrow(self.leader_table))
+        self.leaderboards.write_snapshot(directory)
+
+    @classmethod
+    def load_snapshot(cls, directory, extendable=False):
+        """Attaches to a snapshot written by `write_snapshot`.
+
+        Only an `extendable` load rebuilds the cube and leader table frames that `extend` merges into; workers that just
+        serve queries skip them.
+        """
+        self = cls.__new__(cls)
+        cube = _read_arrow(os.path.join(directory, 'cube.arrow'))
+        if cube.schema.metadata.get(b'player') != b'player_id':
+            raise ValueError(f"{directory} is a snapshot from before the cube was keyed by player_id; publish a new one.")
+        measures = json.loads(cube.schema.metadata[b'measures'])
+        values = _view(pa.chunked_array([chunk.flatten() for chunk in cube.column('values').chunks], pa.int64())).reshape(-1, len(measures))
+        dims = _arrow_to_frame(cube.drop_columns(['values']))
+        self.df = _arrow_to_frame(_read_arrow(os.path.join(directory, 'games.arrow')))
+        self._index_rows(*_player_keys(self.df))
+        self._index_cube({d: series.array for d, series in dims.items()}, measures, values)
+        self.cube = self.leader_table = None
+        if extendable:
+            self.cube = pd.concat([dims, pd.DataFrame(values, columns=measures)], axis=1)
+            self.leader_table = _arrow_to_frame(_read_arrow(os.path.join(directory, 'leader_table.arrow')))
+        self.leaderboards = Leaderboards.load_snapshot(directory)
+        return self
+
+    def extend(self, new_df):
+        """Returns a GameData with `new_df` appended, folding only the new rows into the cube."""
+        return GameData(
+            _concat_games(self.df, new_df), cube=merge_cubes(self.cube, build_cube(new_df)),
+            leader_table=merge_leader_tables(self.leader_table, build_leader_table(new_df)),
+        )
+
+    def top_performers(self, opponent, stat, season='', k=1, min_games=1):
+        """Returns up to `k` (player_name, average, games, single_game_high) tuples, or None if nobody faced `opponent` then."""
+        return self.leaderboards.top(opponent, season, stat, k=k, min_games=min_games)
+
+    def _cube_mask(self, dim, rows, values, normalize=str):
+        codes, categories = self._cube_dims[dim]
+        return np.isin(codes[rows], [code for code, category in enumerate(categories) if normalize(category) in values])
+
+    def player_slice(self, player_name):
+        """Returns the rows of `player_name` (any case) as a slice of `df`, or None for unknown players."""
+        player_ids = self.player_ids.get(player_name.lower())
+        if player_ids is None:
+            return None
+        return slice(self.player_id_rows[player_ids[0]].start, self.player_id_rows[player_ids[-1]].stop)
+
+    def aggregate(self, player_name, seasons=None, opponent=None, game_type=None):
+        """Sums the cube cells matching the filters; returns None when no games match."""
+        player_ids = self.player_ids.get(player_name.lower())
+        if player_ids is None:
+            return None
+        if len(player_ids) == 1:
+            rows = self.cube_rows[player_ids[0]]
+        else:
+            rows = np.concatenate([np.arange(self.cube_rows[i].start, self.cube_rows[i].stop) for i in player_ids])
+        mask = np.ones(len(self._cube_values[rows]), dtype=bool)
+        if seasons:
+            mask &= self._cube_mask('season', rows, seasons)
+        if opponent:
+            mask &= self._cube_mask('opponent', rows, [opponent])
+        if game_type:
+            mask &= self._cube_mask('game_type', rows, [game_type.lower()], str.lower)
+        totals = dict(zip(self._cube_measures, self._cube_values[rows][mask].sum(axis=0)))
+        return totals if totals['games'] > 0 else None
+
+    def player_games(self, player_name, seasons=None, opponent=None):
+        key = player_name.lower()
+        rows = self.player_slice(key)
+        if rows is None:
+            return self.df.iloc[0:0]
+        if not seasons and not opponent:
+            return self.df.iloc[rows]
+        positions = None
+        if seasons:
+            positions = np.unique(np.concatenate([self.season_rows.get((key, s), _NO_ROWS) for s in seasons]))
+        if opponent:
+            opponent_positions = self.opponent_rows.get((key, opponent), _NO_ROWS)
+            positions = opponent_positions if positions is None else np.intersect1d(positions, opponent_positions)
+        return self.df.iloc[positions]
+
+    def stat_timeline(self, player_name, stat, seasons=None):
+        """Returns a StatTimeline of `stat` over the player's games (optionally only `seasons`), or None without games."""
+        games = self.player_games(player_name, seasons=seasons)
+        return StatTimeline(games, stat) if len(games) else None
+
+def snapshot_root(path):
+    return path.rstrip('/\\') + SNAPSHOT_SUFFIX
+
+def current_snapshot(path):
+    """Returns the directory of the snapshot currently published for `path`, or None if there is none."""
+    try:
+        with open(os.path.join(snapshot_root(path), 'CURRENT')) as f:
+            return os.path.join(snapshot_root(path), f.read().strip())
+    except FileNotFoundError:
+        return None
+
+def snapshot_sources(directory):
+    """Returns the `source_files` signature a snapshot was built from, or None for snapshots that did not record one."""
+    try:
+        with open(os.path.join(directory, 'sources.json')) as f:
+            return {name: tuple(sig) for name, sig in json.load(f).items()}
+    except FileNotFoundError:
+        return None
+
+def _extend_current_snapshot(path, files):
+    """Loads the current snapshot with the parquet files added since it was built, or None unless files were only added."""
+    directory = current_snapshot(path)
+    sources = snapshot_sources(directory) if directory and os.path.isdir(path) else None
+    if not sources or any(files.get(f) != sig for f, sig in sources.items()):
+        return None
+    try:
+        data = GameData.load_snapshot(directory, extendable=True)
+    except ValueError:
+        return None
+    added = [f for f in files if f not in sources]
+    return data.extend(compact_dtypes(read_games(path, files=added))) if added else data
+
+@contextmanager
+def _publish_lock(root):
+    """Holds the cross-process lock that serializes snapshot publishers; without fcntl (Windows) there is none."""
+    os.makedirs(root, exist_ok=True)
+    with open(os.path.join(root, '.lock'), 'w') as lock:
+        if fcntl is not None:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+        yield
+
+def publish_snapshot(path, data=None):
+    """Writes a snapshot of the games at `path` and makes it current.
+
+    Unless `data` is given, the snapshot is built from disk: when the dataset only gained parquet files since the
+    current snapshot, those files are folded into it with `GameData.extend`, otherwise everything is reloaded. The
+    `source_files` signature is recorded with the snapshot so the next publish can tell which files were added.
+
+    Publishers are serialized by a lock file next to the snapshots. The snapshot is staged under a temporary name and
+    renamed into place before the CURRENT pointer is swapped, so readers only ever see complete snapshots. Older
+    snapshots beyond the previous one are removed; on POSIX, workers that still have them mapped keep reading their
+    pages until they switch.
+    """
+    with _publish_lock(snapshot_root(path)):
+        files = source_files(path)
+        if data is None:
+            data = _extend_current_snapshot(path, files) or GameData(compact_dtypes(read_games(path)))
+        root = snapshot_root(path)
+        name = f"v{time.time_ns()}"
+        data.write_snapshot(os.path.join(root, f"_{name}.tmp"))
+        with open(os.path.join(root, f"_{name}.tmp", 'sources.json'), 'w') as f:
+            json.dump(files, f)
+        os.replace(os.path.join(root, f"_{name}.tmp"), os.path.join(root, name))
+        with open(os.path.join(root, f"_CURRENT.{name}.tmp"), 'w') as f:
+            f.write(name)
+        os.replace(os.path.join(root, f"_CURRENT.{name}.tmp"), os.path.join(root, 'CURRENT'))
+        for old in sorted(d for d in os.listdir(root) if d.startswith('v') and d != name)[:-1]:
+            shutil.rmtree(os.path.join(root, old), ignore_errors=True)
+        return os.path.join(root, name)
+
+class GameStore:
+    """Process-wide, in-memory copy of the game log, reloaded when the CSV or parquet dataset on disk changes."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._files = None
+        self._data = None
+        self.version = 0
+
+    @property
+    def loaded(self):
+        return self._data is not None
+
+    def get(self):
+        files = source_files(self.path)
+        if files != self._files:
+            with self._lock:
+                if files != self._files:
+                    self._load(files)
+        return self._data
+
+    def _load(self, files):
+        added = [f for f in files if f not in self._files] if self._files else []
+        appended = self._data is not None and added and all(files.get(f) == sig for f, sig in self._files.items())
+        if appended and os.path.isdir(self.path):
+            self._data = self._data.extend(compact_dtypes(read_games(self.path, files=added)))
+            print(f"Appended {len(added)} new file(s) from {self.path}; {len(self._data.df)} games loaded.")
+        else:
+            self._data = GameData(compact_dtypes(read_games(self.path)))
+            print(f"Loaded {len(self._data.df)} games for {len(self._data.player_id_rows)} players from {self.path}.")
+        self._files = files
+        self.version += 1
+
+class SharedGameStore:
+    """Game data shared between worker processes through the memory-mapped snapshot published for `path`.
+
+    Workers never build snapshots themselves: ingestion (or `python data_ingestion.py --publish`) publishes them, and
+    workers follow the CURRENT pointer, so a new version goes live in every worker on its next request.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._pointer = None
+        self._data = None
+        self.version = 0
+
+    @property
+    def loaded(self):
+        return self._data is not None
+
+    def _current_pointer(self):
+        try:
+            stat = os.stat(os.path.join(snapshot_root(self.path), 'CURRENT'))
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns
+
+    def get(self):
+        pointer = self._current_pointer()
+        if pointer is None:
+            raise FileNotFoundError(f"No snapshot published for {self.path}; run `python data_ingestion.py --publish` first.")
+        if pointer != self._pointer:
+            with self._lock:
+                pointer = self._current_pointer()
+                if pointer != self._pointer:
+                    self._attach(pointer)
+        return self._data
+
+    def _attach(self, pointer):
+        directory = current_snapshot(self.path)
+        self._data = GameData.load_snapshot(directory)
+        self._pointer = pointer
+        self.version += 1
+        print(f"Attached snapshot {os.path.basename(directory)}: {len(self._data.df)} games for {len(self._data.player_id_rows)} players.")
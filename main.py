@@ -1,17 +1,65 @@
+import time
+_import_started = time.perf_counter()
 import os
-import pandas as pd
-import openai
-import chromadb
+import math
 import json
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial
 from fastapi import FastAPI, HTTPException
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
-from sentence_transformers import SentenceTransformer
 from dotenv import load_dotenv
+from cache import TTLCache
+from retrieval import GameRetriever
+from metrics import CONTENT_TYPE, Trace, render as render_metrics
+
+class LazyGameStore:
+    """Stands in for a GameStore until first use, so importing main.py does not pull in pandas and pyarrow.
+
+    With `shared`, workers attach to the memory-mapped snapshot published for `path` instead of each loading a copy.
+    """
+
+    def __init__(self, path, shared=False):
+        self.path = path
+        self.shared = shared
+        self._store = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        if self._store is None:
+            with self._lock:
+                if self._store is None:
+                    from game_store import GameStore, SharedGameStore
+                    self._store = (SharedGameStore if self.shared else GameStore)(self.path)
+        return self._store.get()
+
+    @property
+    def version(self):
+        return self._store.version if self._store else 0
+
+    @property
+    def loaded(self):
+        return self._store is not None and self._store.loaded
 
 load_dotenv()
-client = openai.OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 CSV_DATABASE = 'all_games.csv'
+GAMES_DATASET = 'games_parquet'
+games = LazyGameStore(GAMES_DATASET if os.path.isdir(GAMES_DATASET) else CSV_DATABASE, shared=os.getenv("SCOUT_SHARED_DATA", "0") == "1")
+WARMUP_MODE = os.getenv("SCOUT_WARMUP", "background")
+warmup = {"state": "pending", "seconds": None, "error": None}
+CACHE_TTL_SECONDS = float(os.getenv("SCOUT_CACHE_TTL", "3600"))
+tool_cache = TTLCache(maxsize=int(os.getenv("SCOUT_TOOL_CACHE_SIZE", "2048")), ttl=CACHE_TTL_SECONDS)
+answer_cache = TTLCache(maxsize=int(os.getenv("SCOUT_ANSWER_CACHE_SIZE", "512")), ttl=CACHE_TTL_SECONDS)
+retriever = GameRetriever(cache_size=int(os.getenv("SCOUT_EMBEDDING_CACHE_SIZE", "1024")))
+RAG_MAX_RESULTS = 20
+ROLLING_POINTS = 20
+RAG_MAX_CONTEXT_TOKENS = int(os.getenv("SCOUT_RAG_MAX_TOKENS", "800"))
+BATCH_CONCURRENCY = int(os.getenv("SCOUT_BATCH_CONCURRENCY", "8"))
+BATCH_MAX_QUERIES = int(os.getenv("SCOUT_BATCH_MAX_QUERIES", "500"))
+SLOW_REQUEST_SECONDS = float(os.environ["SCOUT_SLOW_REQUEST_SECONDS"]) if os.getenv("SCOUT_SLOW_REQUEST_SECONDS") else None
+tool_executor = ThreadPoolExecutor(max_workers=int(os.getenv("SCOUT_TOOL_WORKERS", "4")), thread_name_prefix="scout-tool")
 
 STAT_MAP = {
     'points': 'pts', 'pts': 'pts', 'rebounds': 'reb', 'reb': 'reb', 'assists': 'ast', 'ast': 'ast',
@@ -30,24 +78,20 @@ CALCULABLE_STATS = ['pts', 'reb', 'ast', 'blk', 'stl', 'tov', 'plus_minus']
 
 def calculate_player_averages(player_name: str, seasons: str = "", opponent: str = "") -> str:
     try:
-        df = pd.read_csv(CSV_DATABASE)
-        filtered_df = df[df['player_name'].str.lower() == player_name.lower()]
-        if seasons:
-            filtered_df = filtered_df[filtered_df['season'].isin([s.strip() for s in seasons.split(',')])]
-        if opponent:
-            opponent_abbr = TEAM_NAME_MAP.get(opponent.lower(), opponent.upper())
-            filtered_df = filtered_df[filtered_df['opponent'] == opponent_abbr]
-        if filtered_df.empty: return "No game data found for the specified criteria."
+        season_list = [s.strip() for s in seasons.split(',')] if seasons else None
+        opponent_abbr = TEAM_NAME_MAP.get(opponent.lower(), opponent.upper()) if opponent else None
+        totals = games.get().aggregate(player_name, seasons=season_list, opponent=opponent_abbr)
+        if totals is None: return "No game data found for the specified criteria."
         
-        avg_stats = {stat: filtered_df[stat].mean() for stat in CALCULABLE_STATS}
+        avg_stats = {stat: totals[stat] / totals[f'{stat}_count'] for stat in CALCULABLE_STATS}
         
-        total_fga = filtered_df['fga'].sum()
-        avg_stats['fg_percentage'] = 0 if total_fga == 0 else (filtered_df['fgm'].sum() / total_fga) * 100
-        total_fg3a = filtered_df['fg3a'].sum()
-        avg_stats['fg3_percentage'] = 0 if total_fg3a == 0 else (filtered_df['fg3m'].sum() / total_fg3a) * 100
+        total_fga = totals['fga']
+        avg_stats['fg_percentage'] = 0 if total_fga == 0 else (totals['fgm'] / total_fga) * 100
+        total_fg3a = totals['fg3a']
+        avg_stats['fg3_percentage'] = 0 if total_fg3a == 0 else (totals['fg3m'] / total_fg3a) * 100
 
         return json.dumps({
-            "games_found": len(filtered_df),
+            "games_found": int(totals['games']),
             "averages": {k: round(v, 1) for k, v in avg_stats.items()}
         })
     except Exception as e:
@@ -55,8 +99,7 @@ def calculate_player_averages(player_name: str, seasons: str = "", opponent: str
 
 def get_player_season_info(player_name: str) -> str:
     try:
-        df = pd.read_csv(CSV_DATABASE)
-        player_df = df[df['player_name'].str.lower() == player_name.lower()]
+        player_df = games.get().player_games(player_name)
         if player_df.empty: return "No data found for this player."
         seasons_played = player_df['season'].unique().tolist()
         return json.dumps({"player_name": player_name, "season_count": len(seasons_played), "seasons_played": seasons_played})
@@ -64,17 +107,16 @@ def get_player_season_info(player_name: str) -> str:
 
 def compare_players_averages(player_a_name: str, player_b_name: str, seasons: str = "") -> str:
     try:
-        df = pd.read_csv(CSV_DATABASE)
+        data = games.get()
+        season_list = [s.strip() for s in seasons.split(',')] if seasons else None
         results = {}
         for player_name in [player_a_name, player_b_name]:
-            filtered_df = df[df['player_name'].str.lower() == player_name.lower()]
-            if seasons:
-                filtered_df = filtered_df[filtered_df['season'].isin([s.strip() for s in seasons.split(',')])]
-            if filtered_df.empty:
+            totals = data.aggregate(player_name, seasons=season_list)
+            if totals is None:
                 results[player_name] = "No data found."
                 continue
             
-            avg_stats = {stat: filtered_df[stat].mean() for stat in CALCULABLE_STATS}
+            avg_stats = {stat: totals[stat] / totals[f'{stat}_count'] for stat in CALCULABLE_STATS}
             results[player_name] = {k: round(v, 1) for k, v in avg_stats.items()}
         return json.dumps(results)
     except Exception as e:
@@ -85,8 +127,7 @@ def get_player_career_high(player_name: str, stat: str) -> str:
         stat_column = STAT_MAP.get(stat.lower())
         if not stat_column:
             return f"Invalid stat '{stat}'. Please use a supported statistic."
-        df = pd.read_csv(CSV_DATABASE)
-        player_df = df[df['player_name'].str.lower() == player_name.lower()]
+        player_df = games.get().player_games(player_name)
         if player_df.empty: return "No data found for this player."
         career_high_game = player_df.loc[player_df[stat_column].idxmax()]
         return json.dumps({
@@ -104,13 +145,12 @@ def get_player_stat_progression(player_name: str, stats: str) -> str:
         invalid_stats = [s for s, c in stat_columns_map.items() if c is None]
         if invalid_stats:
             return f"Invalid stat(s) provided: {', '.join(invalid_stats)}."
-        df = pd.read_csv('all_games.csv')
-        player_df = df[df['player_name'].str.lower() == player_name.lower()]
+        player_df = games.get().player_games(player_name)
         if player_df.empty: return f"No data found for player '{player_name}'."
         results = {"player_name": player_name, "progression_data": {}}
         for user_stat, col_name in stat_columns_map.items():
             if col_name in player_df.columns:
-                progression = player_df.groupby('season')[col_name].mean().round(1)
+                progression = player_df.groupby('season', observed=True)[col_name].mean().round(1)
                 career_average = player_df[col_name].mean()
                 peak_season = progression.idxmax()
                 peak_value = progression.max()
@@ -124,7 +164,7 @@ def get_player_stat_progression(player_name: str, stats: str) -> str:
     except Exception as e:
         return f"An error occurred: {str(e)}"
 
-def find_top_performer_against_team(opponent_team: str, stat: str = "points", season: str = "") -> str:
+def find_top_performer_against_team(opponent_team: str, stat: str = "points", season: str = "", top_k: int = 1, min_games: int = 1) -> str:
     try:
         opponent_abbr = TEAM_NAME_MAP.get(opponent_team.lower())
         if not opponent_abbr and opponent_team.upper() in TEAM_NAME_MAP.values():
@@ -132,49 +172,119 @@ def find_top_performer_against_team(opponent_team: str, stat: str = "points", se
         if not opponent_abbr: return f"Could not find the team '{opponent_team}'."
         stat_col = STAT_MAP.get(stat.lower())
         if not stat_col: return f"Invalid stat '{stat}'."
-        df = pd.read_csv(CSV_DATABASE)
-        filtered_df = df[df['opponent'] == opponent_abbr]
-        if season:
-            filtered_df = filtered_df[filtered_df['season'] == season]
-        if filtered_df.empty: return f"No game data found against {opponent_team} for the specified criteria."
-        player_averages = filtered_df.groupby('player_name')[stat_col].mean()
-        if player_averages.empty: return f"Could not compute averages against {opponent_team}."
-        top_performer_name = player_averages.idxmax()
-        top_average_value = player_averages.max()
-        top_performer_games_df = filtered_df[filtered_df['player_name'] == top_performer_name]
-        games_played = len(top_performer_games_df)
-        single_game_high = int(top_performer_games_df[stat_col].max())
-        return json.dumps({
+        leaders = games.get().top_performers(opponent_abbr, stat_col, season=season, k=max(top_k, 1), min_games=min_games)
+        if leaders is None: return f"No game data found against {opponent_team} for the specified criteria."
+        if not leaders: return f"No player has played at least {min_games} games against {opponent_team} for the specified criteria."
+        top_performer_name, top_average_value, games_played, single_game_high = leaders[0]
+        result = {
             "top_performer": top_performer_name, "against_team": opponent_team, "in_season": season if season else "All-Time", 
             "stat": stat, "average_value": round(top_average_value, 1), 
             "games_played": games_played, "single_game_high": single_game_high
-        })
+        }
+        if top_k > 1:
+            result["leaders"] = [
+                {"player_name": name, "average_value": round(average, 1), "games_played": played, "single_game_high": high}
+                for name, average, played, high in leaders
+            ]
+        return json.dumps(result)
     except Exception as e:
         return f"An error occurred during analysis: {str(e)}"
     
 def get_player_total_stats(player_name: str, seasons: str = "", game_type: str = "") -> str:
     try:
-        df = pd.read_csv('all_games.csv')
-        filtered_df = df[df['player_name'].str.lower() == player_name.lower()]
-        if game_type:
-            filtered_df = filtered_df[filtered_df['game_type'].str.lower() == game_type.lower()]
-        if seasons:
-            season_list = [s.strip() for s in seasons.split(',')]
-            filtered_df = filtered_df[filtered_df['season'].isin(season_list)]
-        if filtered_df.empty:
+        season_list = [s.strip() for s in seasons.split(',')] if seasons else None
+        totals = games.get().aggregate(player_name, seasons=season_list, game_type=game_type)
+        if totals is None:
             return "No game data found for the specified criteria."
-        total_stats = {stat: int(filtered_df[stat].sum()) for stat in CALCULABLE_STATS}
-        total_stats['fgm'] = int(filtered_df['fgm'].sum())
-        total_stats['fga'] = int(filtered_df['fga'].sum())
-        total_stats['fg3m'] = int(filtered_df['fg3m'].sum())
-        total_stats['fg3a'] = int(filtered_df['fg3a'].sum())
+        total_stats = {stat: int(totals[stat]) for stat in CALCULABLE_STATS}
+        total_stats['fgm'] = int(totals['fgm'])
+        total_stats['fga'] = int(totals['fga'])
+        total_stats['fg3m'] = int(totals['fg3m'])
+        total_stats['fg3a'] = int(totals['fg3a'])
         return json.dumps({
-            "games_found": len(filtered_df),
+            "games_found": int(totals['games']),
             "totals": total_stats
         })
     except Exception as e:
         return f"An error occurred: {str(e)}"
 
+def analyze_player_form(player_name: str, stat: str = "points", analysis: str = "recent", window: int = 10, threshold: float = None, seasons: str = "") -> str:
+    try:
+        stat_column = STAT_MAP.get(stat.lower())
+        if not stat_column:
+            return f"Invalid stat '{stat}'. Please use a supported statistic."
+        analysis = analysis.lower()
+        if analysis not in ("recent", "rolling", "best", "worst", "streak"):
+            return f"Invalid analysis '{analysis}'. Use 'recent', 'rolling', 'best', 'worst' or 'streak'."
+        season_list = [s.strip() for s in seasons.split(',')] if seasons else None
+        timeline = games.get().stat_timeline(player_name, stat_column, seasons=season_list)
+        if timeline is None: return "No game data found for the specified criteria."
+        result = {"player_name": player_name, "stat": stat, "analysis": analysis, "games_considered": len(timeline)}
+
+        if analysis == "streak":
+            if threshold is None:
+                return "A threshold is required for a streak analysis (e.g. 20 for consecutive 20-point games)."
+            longest, current = timeline.streaks(threshold)
+            result.update({"threshold": threshold, "current_streak": current, "longest_streak": None})
+            if longest:
+                start, stop = longest
+                result["longest_streak"] = {"games": stop - start, "first_game": timeline.game(start), "last_game": timeline.game(stop - 1)}
+            return json.dumps(result)
+
+        window = max(int(window), 1)
+        if len(timeline) < window:
+            return f"Only {len(timeline)} games found for the specified criteria, fewer than the {window}-game window."
+        result["window"] = window
+        career_average = timeline.average(0, len(timeline))
+        result["overall_average"] = None if career_average is None else round(career_average, 1)
+        if analysis == "recent":
+            average = timeline.average(len(timeline) - window, len(timeline))
+            result.update({
+                "average": None if average is None else round(average, 1),
+                "first_game": timeline.game(len(timeline) - window), "last_game": timeline.game(len(timeline) - 1),
+            })
+        elif analysis == "rolling":
+            averages = timeline.rolling(window)
+            recent = range(max(len(averages) - ROLLING_POINTS, 0), len(averages))
+            result["rolling_averages"] = [
+                {**timeline.game(i + window - 1), "average": None if math.isnan(averages[i]) else round(float(averages[i]), 1)} for i in recent
+            ]
+        else:
+            start = timeline.extreme_window(window, worst=analysis == "worst")
+            if start is None: return f"No {stat} data recorded for the specified criteria."
+            result.update({
+                "average": round(timeline.average(start, start + window), 1), "total": int(timeline.sums[start + window] - timeline.sums[start]),
+                "first_game": timeline.game(start), "last_game": timeline.game(start + window - 1),
+            })
+        return json.dumps(result)
+    except Exception as e:
+        return f"An error occurred: {str(e)}"
+
+def canonical_player_name(player_name: str) -> str:
+    # Chroma filters are exact matches, so use the name as stored rather than as typed.
+    try:
+        data = games.get()
+    except Exception:
+        return player_name
+    rows = data.player_slice(player_name)
+    return player_name if rows is None else data.df['player_name'].iat[rows.start]
+
+def search_game_summaries(query: str, player_name: str = "", season: str = "", opponent: str = "", max_results: int = 8) -> str:
+    try:
+        filters = {
+            "player_name": canonical_player_name(player_name.strip()) if player_name else "",
+            "season": season.strip(),
+            "opponent": TEAM_NAME_MAP.get(opponent.lower(), opponent.upper()) if opponent else "",
+        }
+        hits = retriever.search(query, filters=filters, n_results=min(max(max_results, 1), RAG_MAX_RESULTS), max_tokens=RAG_MAX_CONTEXT_TOKENS)
+        if not hits: return "No matching games found in the vector database."
+        return json.dumps({
+            "filters": {k: v for k, v in filters.items() if v},
+            "matches": [document for document, _, _ in hits]
+        })
+    except Exception as e:
+        return f"An error occurred: {str(e)}"
+
 available_tools = {
     "calculate_player_averages": calculate_player_averages,
     "get_player_season_info": get_player_season_info,
@@ -183,6 +293,8 @@ available_tools = {
     "get_player_stat_progression": get_player_stat_progression,
     "find_top_performer_against_team": find_top_performer_against_team,
     "get_player_total_stats": get_player_total_stats,
+    "search_game_summaries": search_game_summaries,
+    "analyze_player_form": analyze_player_form,
 }
 
 system_prompt = """
@@ -277,13 +389,15 @@ tools_schema = [
         "type": "function",
         "function": {
             "name": "find_top_performer_against_team",
-            "description": "Finds the player with the highest average for a specific stat against a given opponent.",
+            "description": "Finds the player (or top players) with the highest average for a specific stat against a given opponent.",
             "parameters": {
                 "type": "object",
                 "properties": {
                     "opponent_team": {"type": "string", "description": "The name, city, or abbreviation of the opponent team."},
                     "stat": {"type": "string", "description": "Optional. The statistic to measure. Defaults to 'points'."},
-                    "season": {"type": "string", "description": "Optional. The specific season to filter for."}
+                    "season": {"type": "string", "description": "Optional. The specific season to filter for."},
+                    "top_k": {"type": "integer", "description": "Optional. How many top players to return, e.g. 10 for a leaderboard. Defaults to 1."},
+                    "min_games": {"type": "integer", "description": "Optional. Minimum games against the opponent to qualify, e.g. 5 to ignore one-game outliers. Defaults to 1."}
                 },
                 "required": ["opponent_team"]
             }
@@ -304,59 +418,312 @@ tools_schema = [
                 "required": ["player_name"]
             }
         }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "search_game_summaries",
+            "description": "Searches the game-by-game text summaries for the games that best match a description, e.g. 'triple-double performances' or 'games with a big plus-minus'. Use it for qualitative or open-ended questions; use the other tools for exact numbers.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "query": {"type": "string", "description": "A description of the kind of games to find."},
+                    "player_name": {"type": "string", "description": "Optional. Only search this player's games."},
+                    "season": {"type": "string", "description": "Optional. Only search this season (e.g., '2023-24')."},
+                    "opponent": {"type": "string", "description": "Optional. Only search games against this team (name or abbreviation)."},
+                    "max_results": {"type": "integer", "description": "Optional. Maximum number of games to return. Defaults to 8."}
+                },
+                "required": ["query"]
+            }
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "analyze_player_form",
+            "description": "Analyzes a player's form over consecutive games: the average over the most recent N games, the rolling N-game average, the best or worst N-game stretch, or the longest streak of games at or above a threshold (e.g. consecutive 20-point games).",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "player_name": {"type": "string", "description": "The full name of the player."},
+                    "stat": {"type": "string", "description": "Optional. The statistic to analyze. Defaults to 'points'."},
+                    "analysis": {"type": "string", "enum": ["recent", "rolling", "best", "worst", "streak"], "description": "Optional. 'recent' (last N games), 'rolling' (recent rolling N-game averages), 'best'/'worst' (N-game stretch) or 'streak' (needs threshold). Defaults to 'recent'."},
+                    "window": {"type": "integer", "description": "Optional. The number of games N in each window. Defaults to 10."},
+                    "threshold": {"type": "number", "description": "Required for 'streak'. The minimum value of the stat for a game to extend the streak."},
+                    "seasons": {"type": "string", "description": "Optional. A comma-separated string of seasons to restrict the games to."}
+                },
+                "required": ["player_name"]
+            }
+        }
     }
 ]
 
 app = FastAPI()
 class Query(BaseModel): query: str
+class BatchQuery(BaseModel): queries: list[str]
 
-@app.post("/scout")
-async def scout_player(query: Query):
-    messages = [
+@lru_cache(maxsize=None)
+def llm():
+    import openai
+    return openai.AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+
+def warm_up():
+    warmup["state"] = "loading"
+    start = time.perf_counter()
+    try:
+        games.get()
+        llm()
+        warmup.update(state="ready", seconds=round(time.perf_counter() - start, 2), error=None)
+    except Exception as e:
+        warmup.update(state="failed", error=str(e))
+        print(f"Could not load game data at startup: {e}")
+
+@app.on_event("startup")
+def load_game_store():
+    # SCOUT_WARMUP: "background" loads the data after startup so the port binds right away, "eager" blocks startup
+    # until it is loaded, and "lazy" waits for the first request.
+    if WARMUP_MODE == "eager":
+        warm_up()
+    elif WARMUP_MODE == "background":
+        threading.Thread(target=warm_up, name="scout-warmup", daemon=True).start()
+
+def normalize_text(text: str) -> str:
+    return " ".join(text.casefold().split())
+
+def data_version():
+    try:
+        games.get()
+    except Exception:
+        return None
+    return games.version
+
+async def current_data_version(trace):
+    with trace.span("data_load", loaded=games.loaded):
+        return await asyncio.get_running_loop().run_in_executor(tool_executor, data_version)
+
+async def run_tool_call(tool_call, trace, inflight=None):
+    # `inflight` maps cache keys to running tool calls, so a batch runs each distinct call once even before the
+    # first result reaches the tool cache.
+    function_name = tool_call.function.name
+    function_to_call = available_tools[function_name]
+    function_args = json.loads(tool_call.function.arguments)
+    cache_key = (function_name, json.dumps({k: normalize_text(v) if isinstance(v, str) else v for k, v in function_args.items()}, sort_keys=True))
+    version = await current_data_version(trace)
+    with trace.span("tool", tool=function_name, arguments=function_args) as span:
+        hit, function_response = tool_cache.get(cache_key, version)
+        result = "hit"
+        if not hit and inflight is not None and (cache_key, version) in inflight:
+            function_response, result = await inflight[(cache_key, version)], "shared"
+        elif not hit:
+            future = asyncio.get_running_loop().run_in_executor(tool_executor, partial(function_to_call, **function_args))
+            if inflight is not None:
+                inflight[(cache_key, version)] = future
+            function_response = await future
+            result = "miss"
+            if not function_response.startswith("An error occurred"):
+                tool_cache.set(cache_key, function_response, version)
+        span["result"] = "error" if function_response.startswith("An error occurred") else result
+    return {
+        "tool_call_id": tool_call.id,
+        "role": "tool",
+        "name": function_name,
+        "content": function_response,
+    }
+
+def initial_messages(query: str):
+    return [
         {"role": "system", "content": system_prompt},
-        {"role": "user", "content": query.query}
+        {"role": "user", "content": query}
     ]
-    
-    try:
-        response = client.chat.completions.create(
+
+async def request_tool_calls(messages, trace):
+    with trace.span("llm_tool_selection"):
+        response = await llm().chat.completions.create(
             model="gpt-4o-mini",
             messages=messages,
             tools=tools_schema,
             tool_choice="auto"
         )
-        
-        response_message = response.choices[0].message
-        tool_calls = response_message.tool_calls
+    trace.record_usage("tool_selection", response.usage)
+    return response.choices[0].message
 
-        if tool_calls:
-            messages.append(response_message)
-            
-            for tool_call in tool_calls:
-                function_name = tool_call.function.name
-                function_to_call = available_tools[function_name]
-                function_args = json.loads(tool_call.function.arguments)
-                function_response = function_to_call(**function_args)
-                
-                messages.append({
-                    "tool_call_id": tool_call.id,
-                    "role": "tool",
-                    "name": function_name,
-                    "content": function_response,
-                })
-            
-            final_response = client.chat.completions.create(
+async def run_tool_calls(messages, response_message, trace, inflight=None):
+    messages.append(response_message)
+    messages.extend(await asyncio.gather(*(run_tool_call(tool_call, trace, inflight) for tool_call in response_message.tool_calls)))
+
+async def answer_query(query: str, trace, inflight=None):
+    """Runs one question through the tool-calling pipeline; returns (answer, whether it came from the answer cache)."""
+    messages = initial_messages(query)
+    cache_key, version = normalize_text(query), await current_data_version(trace)
+    hit, answer = answer_cache.get(cache_key, version)
+    if hit:
+        return answer, True
+
+    response_message = await request_tool_calls(messages, trace)
+
+    if response_message.tool_calls:
+        await run_tool_calls(messages, response_message, trace, inflight)
+        
+        with trace.span("llm_final"):
+            final_response = await llm().chat.completions.create(
                 model="gpt-4o-mini",
                 messages=messages,
             )
-            return {"response": final_response.choices[0].message.content}
-        else:
-            return {"response": response_message.content}
+        trace.record_usage("final", final_response.usage)
+        answer = final_response.choices[0].message.content
+    else:
+        answer = response_message.content
+    if answer:
+        answer_cache.set(cache_key, answer, version)
+    return answer, False
+
+@app.post("/scout")
+async def scout_player(query: Query):
+    trace, outcome = Trace("/scout"), "error"
+    
+    try:
+        answer, cached = await answer_query(query.query, trace)
+        outcome = "cached" if cached else "ok"
+        return {"response": answer}
 
     except Exception as e:
         print(f"An error occurred: {e}")
         raise HTTPException(status_code=500, detail="An error occurred with the AI model.")
+    finally:
+        trace.finish(outcome, SLOW_REQUEST_SECONDS)
+
+def sse_event(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+async def scout_events(query: str):
+    messages = initial_messages(query)
+    # Stays "cancelled" if the client disconnects and the generator is closed mid-stream.
+    trace, outcome = Trace("/scout/stream"), "cancelled"
+    try:
+        cache_key, version = normalize_text(query), await current_data_version(trace)
+        hit, answer = answer_cache.get(cache_key, version)
+        if hit:
+            outcome = "cached"
+            yield sse_event("token", {"content": answer})
+            yield sse_event("done", {"cached": True})
+            return
+
+        yield sse_event("status", {"message": "Analyzing your question…"})
+        response_message = await request_tool_calls(messages, trace)
+        answer = ""
+
+        if response_message.tool_calls:
+            for tool_call in response_message.tool_calls:
+                yield sse_event("status", {"message": f"Calling {tool_call.function.name}…"})
+            await run_tool_calls(messages, response_message, trace)
+            yield sse_event("status", {"message": "Writing the scouting report…"})
+
+            with trace.span("llm_final"):
+                stream = await llm().chat.completions.create(
+                    model="gpt-4o-mini",
+                    messages=messages,
+                    stream=True,
+                    stream_options={"include_usage": True},
+                )
+                async for chunk in stream:
+                    trace.record_usage("final", chunk.usage)
+                    content = chunk.choices[0].delta.content if chunk.choices else None
+                    if content:
+                        answer += content
+                        yield sse_event("token", {"content": content})
+        elif response_message.content:
+            answer = response_message.content
+            yield sse_event("token", {"content": answer})
+        if answer:
+            answer_cache.set(cache_key, answer, version)
+        outcome = "ok"
+        yield sse_event("done", {})
+
+    except Exception as e:
+        outcome = "error"
+        print(f"An error occurred: {e}")
+        yield sse_event("error", {"detail": "An error occurred with the AI model."})
+    finally:
+        trace.finish(outcome, SLOW_REQUEST_SECONDS)
+
+@app.post("/scout/stream")
+async def scout_player_stream(query: Query):
+    return StreamingResponse(scout_events(query.query), media_type="text/event-stream", headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+async def batch_events(queries: list[str]):
+    # Repeated questions are answered once; the semaphore bounds how many distinct questions are talking to OpenAI.
+    started = time.perf_counter()
+    semaphore, inflight = asyncio.Semaphore(BATCH_CONCURRENCY), {}
+    indexes = {}
+    for index, query in enumerate(queries):
+        indexes.setdefault(normalize_text(query), []).append(index)
+
+    async def scout(query):
+        async with semaphore:
+            trace, outcome = Trace("/scout/batch"), "cancelled"
+            try:
+                answer, cached = await answer_query(query, trace, inflight)
+                outcome = "cached" if cached else "ok"
+                return query, answer, None
+            except Exception as e:
+                outcome = "error"
+                print(f"An error occurred: {e}")
+                return query, None, "An error occurred with the AI model."
+            finally:
+                trace.finish(outcome, SLOW_REQUEST_SECONDS)
+
+    tasks = [asyncio.ensure_future(scout(queries[positions[0]])) for positions in indexes.values()]
+    failed = 0
+    try:
+        for next_result in asyncio.as_completed(tasks):
+            query, answer, error = await next_result
+            failed += error is not None
+            for index in indexes[normalize_text(query)]:
+                if error:
+                    yield sse_event("error", {"index": index, "query": queries[index], "detail": error})
+                else:
+                    yield sse_event("result", {"index": index, "query": queries[index], "response": answer})
+        yield sse_event("done", {"queries": len(queries), "distinct": len(tasks), "failed": failed, "seconds": round(time.perf_counter() - started, 3)})
+    finally:
+        for task in tasks:
+            task.cancel()
+
+@app.post("/scout/batch")
+async def scout_batch(batch: BatchQuery):
+    if not batch.queries:
+        raise HTTPException(status_code=400, detail="Provide at least one query.")
+    if len(batch.queries) > BATCH_MAX_QUERIES:
+        raise HTTPException(status_code=400, detail=f"A batch can hold at most {BATCH_MAX_QUERIES} queries.")
+    return StreamingResponse(batch_events(batch.queries), media_type="text/event-stream", headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@app.get("/cache/stats")
+def cache_stats():
+    return {"data_version": games.version, "tool_cache": tool_cache.stats(), "answer_cache": answer_cache.stats(), "retriever": retriever.stats()}
+
+@app.get("/metrics")
+def metrics():
+    return PlainTextResponse(render_metrics(), media_type=CONTENT_TYPE)
+
+def rss_mb():
+    try:
+        with open('/proc/self/statm') as f:
+            return round(int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2**20, 1)
+    except (OSError, ValueError):
+        return None
+
+@app.get("/health")
+def health():
+    ready = games.loaded or WARMUP_MODE == "lazy"
+    body = {
+        "status": "ready" if games.loaded else warmup["state"], "data_loaded": games.loaded, "data_version": games.version,
+        "warmup_mode": WARMUP_MODE, "warmup_seconds": warmup["seconds"], "import_seconds": IMPORT_SECONDS, "rss_mb": rss_mb(),
+    }
+    if warmup["error"] and not games.loaded:
+        body["error"] = warmup["error"]
+    return JSONResponse(body, status_code=200 if ready else 503)
 
 @app.get("/")
 def read_root():
     return FileResponse('index.html')
 
+IMPORT_SECONDS = round(time.perf_counter() - _import_started, 3)
@@ -0,0 +1,117 @@
+import json
+import time
+import threading
+from contextlib import contextmanager
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+REGISTRY = []
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _labels(names, values, extra=()):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in [*zip(names, values), *extra]]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+class Counter:
+    """Thread-safe counter with a fixed set of label names, rendered in the Prometheus text format."""
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name, self.documentation, self.labelnames = name, documentation, tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def inc(self, amount=1, **labels):
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self):
+        with self._lock:
+            values = sorted(self._values.items())
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        lines += [f"{self.name}{_labels(self.labelnames, key)} {value}" for key, value in values]
+        return lines
+
+class Histogram:
+    """Thread-safe histogram with cumulative `le` buckets, a sum and a count per label set."""
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name, self.documentation, self.labelnames = name, documentation, tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._values = {}
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def observe(self, value, **labels):
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            state = self._values.setdefault(key, [[0] * len(self.buckets), 0.0, 0])
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[0][i] += 1
+            state[1] += value
+            state[2] += 1
+
+    def render(self):
+        with self._lock:
+            values = sorted((key, (list(counts), total, count)) for key, (counts, total, count) in self._values.items())
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        for key, (counts, total, count) in values:
+            for bound, bucket_count in zip(self.buckets, counts):
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, key, [('le', bound)])} {bucket_count}")
+            lines.append(f"{self.name}_bucket{_labels(self.labelnames, key, [('le', '+Inf')])} {count}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {total}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {count}")
+        return lines
+
+def render():
+    return "\n".join(line for metric in REGISTRY for line in metric.render()) + "\n"
+
+REQUEST_SECONDS = Histogram("scout_request_seconds", "End-to-end latency of scouting requests.", ["endpoint", "outcome"])
+SPAN_SECONDS = Histogram("scout_span_seconds", "Latency of each stage of a scouting request.", ["span"])
+TOOL_SECONDS = Histogram("scout_tool_seconds", "Latency of tool calls, by tool and cache result.", ["tool", "result"])
+LLM_TOKENS = Counter("scout_llm_tokens_total", "Tokens reported by the OpenAI API, by model call and token kind.", ["call", "kind"])
+
+class Trace:
+    """Timed spans and token usage for one scouting request.
+
+    Spans go into the histograms as they finish; the full breakdown, including tool arguments, is only kept for the
+    slow-request log, so arguments never become metric labels.
+    """
+
+    def __init__(self, endpoint):
+        self.endpoint = endpoint
+        self.started = time.perf_counter()
+        self.spans = []
+        self.tokens = {}
+
+    @contextmanager
+    def span(self, name, **attributes):
+        """Times the block; the caller can add attributes (like a cache result) to the yielded dict."""
+        start = time.perf_counter()
+        try:
+            yield attributes
+        finally:
+            seconds = time.perf_counter() - start
+            self.spans.append({"span": name, "seconds": round(seconds, 4), **attributes})
+            SPAN_SECONDS.observe(seconds, span=name)
+            if name == "tool":
+                TOOL_SECONDS.observe(seconds, tool=attributes["tool"], result=attributes.get("result", "error"))
+
+    def record_usage(self, call, usage):
+        if usage is None:
+            return
+        for kind in ("prompt", "completion"):
+            tokens = getattr(usage, f"{kind}_tokens", 0) or 0
+            LLM_TOKENS.inc(tokens, call=call, kind=kind)
+            self.tokens[f"{call}_{kind}"] = self.tokens.get(f"{call}_{kind}", 0) + tokens
+
+    def finish(self, outcome, slow_seconds=None):
+        seconds = time.perf_counter() - self.started
+        REQUEST_SECONDS.observe(seconds, endpoint=self.endpoint, outcome=outcome)
+        if slow_seconds is not None and seconds >= slow_seconds:
+            print(f"Slow request on {self.endpoint} ({seconds:.2f}s, {outcome}): {json.dumps({'spans': self.spans, 'tokens': self.tokens})}")
+        return seconds
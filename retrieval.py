@@ -0,0 +1,74 @@
+import math
+import threading
+from functools import lru_cache
+
+VECTOR_DB_PATH = "./chroma_db"
+COLLECTION_NAME = "nba_scout"
+EMBEDDING_MODEL = 'paraphrase-MiniLM-L3-v2'
+CHARS_PER_TOKEN = 4
+
+def estimate_tokens(text):
+    """Rough token count (about four characters per token for English text), used to budget retrieved context."""
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+def where_filter(filters):
+    """Builds a Chroma `where` clause from exact-match metadata filters, skipping empty values."""
+    conditions = [{key: value} for key, value in filters.items() if value]
+    if not conditions:
+        return None
+    return conditions[0] if len(conditions) == 1 else {"$and": conditions}
+
+class GameRetriever:
+    """Semantic search over the `nba_scout` game summaries built by data_ingestion.py.
+
+    The embedding model and the Chroma client are only loaded on the first search, and query embeddings are kept
+    in an LRU cache so repeated questions skip the encoder.
+    """
+
+    def __init__(self, path=VECTOR_DB_PATH, collection=COLLECTION_NAME, model_name=EMBEDDING_MODEL, cache_size=1024):
+        self.path = path
+        self.collection_name = collection
+        self.model_name = model_name
+        self._lock = threading.Lock()
+        self._model = None
+        self._collection = None
+        self.embed = lru_cache(maxsize=cache_size)(self._embed)
+
+    def _load(self):
+        if self._collection is None:
+            with self._lock:
+                if self._collection is None:
+                    import chromadb
+                    from sentence_transformers import SentenceTransformer
+                    self._model = SentenceTransformer(self.model_name)
+                    self._collection = chromadb.PersistentClient(path=self.path).get_collection(name=self.collection_name)
+                    print(f"Loaded {self.model_name} and the '{self.collection_name}' collection ({self._collection.count()} documents).")
+        return self._model, self._collection
+
+    def _embed(self, text):
+        model, _ = self._load()
+        return tuple(model.encode([text], show_progress_bar=False)[0].tolist())
+
+    def search(self, query, filters=None, n_results=8, max_tokens=None):
+        """Returns up to `n_results` (document, metadata, distance) hits, best first.
+
+        Metadata filters are applied by Chroma before the vector scan. With `max_tokens`, hits are kept in rank order
+        until the next one would push the estimated context past the budget.
+        """
+        _, collection = self._load()
+        result = collection.query(
+            query_embeddings=[list(self.embed(" ".join(query.split())))], n_results=n_results,
+            where=where_filter(filters or {}), include=["documents", "metadatas", "distances"],
+        )
+        hits, used = [], 0
+        for document, metadata, distance in zip(result['documents'][0], result['metadatas'][0], result['distances'][0]):
+            cost = estimate_tokens(document)
+            if max_tokens is not None and used + cost > max_tokens:
+                break
+            hits.append((document, metadata, distance))
+            used += cost
+        return hits
+
+    def stats(self):
+        info = self.embed.cache_info()
+        return {"loaded": self._collection is not None, "embedding_cache": {"hits": info.hits, "misses": info.misses, "size": info.currsize, "maxsize": info.maxsize}}